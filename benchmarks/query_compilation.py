@@ -0,0 +1,52 @@
+"""
+Event Bot Server
+
+Per-request query building overhead: SQLAlchemy statement built and
+compiled with :func:`asyncpgsa.compile_query` vs precompiled template.
+
+    python -m benchmarks.query_compilation
+"""
+
+import timeit
+import uuid
+
+import asyncpgsa
+import sqlalchemy as sa
+from sqlalchemy.sql import select
+
+from eventbot.app import models
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+NUMBER = 10000
+
+
+def build(event_id):
+    return (select([models.person.t])
+        .select_from(models.person.t)
+        .where(models.person.t.c.event_id == event_id)
+        .order_by(models.person.t.c.name.asc())
+        .order_by(models.person.t.c.id.desc())
+        .apply_labels())
+
+
+template = Template("benchmarks.list_persons",
+                    build(sa.bindparam("event_id")))
+
+
+def main():
+    event_id = uuid.uuid4()
+
+    assert (asyncpgsa.compile_query(build(event_id)) ==
+            template.bind(event_id=event_id))
+
+    for name, fn in [
+        ("compile_query", lambda: asyncpgsa.compile_query(build(event_id))),
+        ("template", lambda: template.bind(event_id=event_id))
+    ]:
+        seconds = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print(f"{name:>16}: {seconds / NUMBER * 1e6:8.2f} us per query")
+
+
+if __name__ == "__main__":
+    main()
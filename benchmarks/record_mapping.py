@@ -0,0 +1,86 @@
+"""
+Event Bot Server
+
+Records to JSON-ready dicts: :meth:`Table.parse` followed by the model
+`json_format` vs compiled record mapper, for a 300 sessions schedule.
+Then the whole response body: mapper and `json.dumps` of the wrapped
+list vs compiled record encoder.
+
+    python -m benchmarks.record_mapping
+"""
+
+import collections
+import json
+import timeit
+import uuid
+
+import pendulum
+from asyncpg.protocol.protocol import _create_record
+
+from eventbot.app import models
+from eventbot.lib import response_wrapper
+
+
+NUMBER = 100
+SESSIONS = 300
+
+COLUMNS = [
+    "sessions_id",
+    "sessions_event_id",
+    "sessions_title",
+    "sessions_description",
+    "sessions_start_time",
+    "sessions_end_time",
+    "sessions_created_at"
+]
+
+
+def records():
+    mapping = collections.OrderedDict(
+        (name, i) for i, name in enumerate(COLUMNS))
+    event_id = uuid.uuid4()
+    now = pendulum.now("UTC")
+
+    return [
+        _create_record(mapping, (uuid.uuid4(), event_id, "Title",
+                                 "Description", now, now, now))
+        for _ in range(SESSIONS)
+    ]
+
+
+def main():
+    rows = records()
+    map_session = models.session.t.mapper(
+        models.session.json_fields, COLUMNS, prefix="sessions_")
+
+    def parse():
+        return [
+            models.session.json_format(
+                models.session.t.parse(row, prefix="sessions_"))
+            for row in rows
+        ]
+
+    encode_session = models.session.t.encoder(
+        models.session.json_fields, COLUMNS, prefix="sessions_")
+
+    def mapper():
+        return [map_session(row) for row in rows]
+
+    def dumps():
+        return json.dumps(response_wrapper.ok(mapper()),
+                          separators=(",", ":")).encode()
+
+    def encoder():
+        return response_wrapper.ok_list(encode_session(row) for row in rows)
+
+    assert parse() == mapper()
+    assert dumps() == encoder()
+
+    for name, fn in [("parse", parse), ("mapper", mapper),
+                     ("dumps", dumps), ("encoder", encoder)]:
+        seconds = min(timeit.repeat(fn, number=NUMBER, repeat=5))
+        print(f"{name:>8}: {seconds / NUMBER * 1e3:8.3f} ms per schedule")
+
+
+if __name__ == "__main__":
+    main()
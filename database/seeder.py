@@ -3,7 +3,6 @@ Event Bot Server
 """
 
 import asyncio
-import functools
 import itertools
 import time
 
@@ -52,18 +51,9 @@ seeds_list = [
 ]
 
 
-async def main(semaphore):
-    requests_number = 0
+async def main():
     requests_time = 0
 
-    async def request(semaphore, coro_or_future, callback=None):
-        async with semaphore:
-            conn = await coro_or_future
-            resp = await conn.json()
-            conn.close()
-
-            return resp["data"] if resp is not None else None, callback
-
     async with aiohttp.ClientSession() as session:
         for seeds_module in seeds_list:
             print(f"Processing {seeds_module}...")
@@ -77,64 +67,28 @@ async def main(semaphore):
             print("Event created...")
 
             _1 = event["id"]
-            futures = []
-
-            for name, source in (("persons", persons),
-                                 ("locations", locations),
-                                 ("tags", tags),
-                                 ("sessions", sessions)):
-                # Push an object to the server and replace it in the
-                # original dict with a created object (by the same ID)
-                for key in source:
-                    futures.append(request(
-                        semaphore,
-                        session.post(f"{SERVER_URL}/events/{_1}/{name}", json=source[key]),
-                        functools.partial(
-                            lambda key, source, response: source.update({key: response}),
-                            key,
-                            source
-                        )
-                    ))
-
-            requests_number += len(futures)
-            start_time = time.time()
-            results = await asyncio.gather(*futures)
-            end_time = time.time()
-            requests_time += end_time - start_time
-
-            print(f"Persons, locations, tags and sessions created in {end_time - start_time} seconds, {len(futures) / (end_time - start_time)} req/s.")
-
-            for response, callback in results:
-                callback(response)
-
-            futures = []
-
-            for key in sessions_adds:
-                _2 = sessions[key]["id"]
 
-                for name, updated, source in (("persons", persons, sessions_adds[key]["persons"]),
-                                              ("locations", locations, sessions_adds[key]["locations"]),
-                                              ("tags", tags, sessions_adds[key]["tags"])):
-                    for id in source:
-                        _3 = updated[id]["id"]
-                        futures.append(request(
-                            semaphore,
-                            session.put(f"{SERVER_URL}/events/{_1}/sessions/{_2}/{name}/{_3}")
-                        ))
+            # Everything else is imported at once, the server resolves
+            # IDs, which are needed only for seeder purposes
+            data = {
+                "persons": persons,
+                "locations": locations,
+                "tags": tags,
+                "sessions": sessions,
+                "sessions_adds": sessions_adds
+            }
 
-            requests_number += len(futures)
             start_time = time.time()
-            await asyncio.gather(*futures)
+            async with session.post(f"{SERVER_URL}/events/{_1}/import", json=data) as response:
+                await response.json()
             end_time = time.time()
             requests_time += end_time - start_time
 
-            print(f"Sessions additionals pushed in {end_time - start_time} seconds, {len(futures) / (end_time - start_time)} req/s.")
+            print(f"Persons, locations, tags, sessions and sessions additionals imported in {end_time - start_time} seconds.")
 
-    print(f"Done in {end_time - start_time} seconds.")
-    print(f"{requests_number / requests_time} req/s.")
+    print(f"Done in {requests_time} seconds.")
 
 
 if __name__ == "__main__":
     loop = asyncio.get_event_loop()
-    semaphore = asyncio.Semaphore(1000)
-    loop.run_until_complete(main(semaphore))
+    loop.run_until_complete(main())
@@ -21,6 +21,22 @@ if port is not None:
     config.app.PORT = int(port)
 
 
+# Machine of the server for Snowflake IDs
+
+machine_id = os.environ.get("MACHINE_ID")
+
+if machine_id is not None:
+    config.app.MACHINE_ID = int(machine_id)
+
+
+# Server-Timing header of responses
+
+server_timing = os.environ.get("SERVER_TIMING")
+
+if server_timing is not None:
+    config.app.SERVER_TIMING = bool(int(server_timing))
+
+
 # Database connection parameters
 
 db = os.environ.get("DATABASE_URL")
@@ -43,6 +59,81 @@ if pool_max_size is not None:
     config.db.POOL_MAX_SIZE = int(pool_max_size)
 
 
+# Slow query log
+
+slow_query_threshold = os.environ.get("SLOW_QUERY_THRESHOLD")
+slow_query_explain_rate = os.environ.get("SLOW_QUERY_EXPLAIN_RATE")
+slow_query_endpoint = os.environ.get("SLOW_QUERY_ENDPOINT")
+
+if slow_query_threshold is not None:
+    config.db.SLOW_QUERY_THRESHOLD = float(slow_query_threshold)
+
+if slow_query_explain_rate is not None:
+    config.db.SLOW_QUERY_EXPLAIN_RATE = float(slow_query_explain_rate)
+
+if slow_query_endpoint is not None:
+    config.db.SLOW_QUERY_ENDPOINT = bool(int(slow_query_endpoint))
+
+
+# Repeated statements detection
+
+repeated_queries_mode = os.environ.get("REPEATED_QUERIES_MODE")
+repeated_queries_threshold = os.environ.get("REPEATED_QUERIES_THRESHOLD")
+
+if repeated_queries_mode is not None:
+    config.db.REPEATED_QUERIES_MODE = repeated_queries_mode
+
+if repeated_queries_threshold is not None:
+    config.db.REPEATED_QUERIES_THRESHOLD = int(repeated_queries_threshold)
+
+
+# Primary keys strategy
+
+id_strategy = os.environ.get("ID_STRATEGY")
+
+time_ordered_ids = os.environ.get("TIME_ORDERED_IDS")
+
+if id_strategy is not None:
+    config.db.ID_STRATEGY = id_strategy
+
+if time_ordered_ids is not None:
+    config.db.TIME_ORDERED_IDS = bool(int(time_ordered_ids))
+
+
+# Database schema upgrade on start
+
+migrate = os.environ.get("MIGRATE")
+
+if migrate is not None:
+    config.db.MIGRATE = bool(int(migrate))
+
+
+# In-process caches size limits
+
+schedule_cache_max_size = os.environ.get("SCHEDULE_CACHE_MAX_SIZE")
+schedule_cache_max_versions = os.environ.get("SCHEDULE_CACHE_MAX_VERSIONS")
+event_versions_max_entries = os.environ.get("EVENT_VERSIONS_MAX_ENTRIES")
+
+if schedule_cache_max_size is not None:
+    config.cache.SCHEDULE_MAX_SIZE = int(schedule_cache_max_size)
+if schedule_cache_max_versions is not None:
+    config.cache.SCHEDULE_MAX_VERSIONS = int(schedule_cache_max_versions)
+if event_versions_max_entries is not None:
+    config.cache.EVENT_VERSIONS_MAX_ENTRIES = int(event_versions_max_entries)
+
+
+# Password hashing process pool
+
+password_workers = os.environ.get("PASSWORD_WORKERS")
+password_concurrency = os.environ.get("PASSWORD_CONCURRENCY")
+
+if password_workers is not None:
+    config.passlib.MAX_WORKERS = int(password_workers)
+
+if password_concurrency is not None:
+    config.passlib.MAX_CONCURRENCY = int(password_concurrency)
+
+
 # Secret for the JWT generation
 
 secret = os.environ.get("SECRET")
@@ -51,6 +142,14 @@ if secret is not None:
     config.jose.SECRET = secret
 
 
+# Authentication of requests
+
+authentication_required = os.environ.get("AUTHENTICATION_REQUIRED")
+
+if authentication_required is not None:
+    config.jose.AUTHENTICATION_REQUIRED = bool(int(authentication_required))
+
+
 # Application starting
 
 server.run()
@@ -2,18 +2,23 @@
 Event Bot Server
 """
 
+from .debug import SlowQueriesController
 from .events import (
     EventController,
     EventsController
 )
+from .imports import EventImportController
 from .locations import LocationsController
 from .persons import PersonsController
 from .platforms import PlatformsController
 from .sessions import (
     SessionsController,
     SessionLocationController,
+    SessionLocationsController,
     SessionPersonController,
-    SessionTagController
+    SessionPersonsController,
+    SessionTagController,
+    SessionTagsController
 )
 from .tags import TagsController
 from .users import (
@@ -0,0 +1,26 @@
+"""
+Event Bot Server
+"""
+
+from sanic import response
+from sanic.views import HTTPMethodView
+
+from eventbot.app import helpers
+from eventbot.config import db as config
+from eventbot.lib import response_wrapper
+
+
+class SlowQueriesController(HTTPMethodView):
+
+    async def get(self, request):
+        """Returns plans of the last explained slow statements, the newest
+        first. Available only if enabled by the configuration."""
+        if not config.SLOW_QUERY_ENDPOINT:
+            return response.json(
+                response_wrapper.error("Not found"),
+                status=404)
+
+        plans = list(helpers.slow_queries.get_plans())
+        plans.reverse()
+
+        return response.json(response_wrapper.ok(plans))
@@ -2,191 +2,220 @@
 Event Bot Server
 """
 
-import asyncpgsa
 import pendulum
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
 from sanic.views import HTTPMethodView
 from sqlalchemy.sql import select
 
+from eventbot.app import ids
 from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import listing
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+# Precompiled queries
+
+select_event = Template("events.select", select([models.event.t])
+    .select_from(models.event.t)
+    .where(models.event.t.c.id == sa.bindparam("id")))
+
+select_event_labeled = Template("events.select_labeled", select([models.event.t])
+    .select_from(models.event.t)
+    .where(models.event.t.c.id == sa.bindparam("id"))
+    .apply_labels())
+
+insert_event = Template("events.insert", models.event.t
+    .insert()
+    .values(name=sa.bindparam("name"),
+            description=sa.bindparam("description"),
+            start_date=sa.bindparam("start_date"),
+            end_date=sa.bindparam("end_date"))
+    .returning(*models.event.t.c))
+
+keyset = listing.Keyset(*models.event.listing_order)
+"""Keyset pagination of events."""
+
+list_events = Template("events.list", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t))
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_events_before = Template("events.list_before", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_events_after = Template("events.list_after", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+# listings of events, created within a time range
+list_created_events = Template("events.list_created", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t)
+          .where(ids.created_between(models.event.t)))
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_created_events_before = Template("events.list_created_before", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t)
+          .where(ids.created_between(models.event.t)),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_created_events_after = Template("events.list_created_after", keyset
+    .page(select([models.event.t])
+          .select_from(models.event.t)
+          .where(ids.created_between(models.event.t)),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+
+# Precompiled record mappers and encoders
+
+# all listing templates have the same result columns
+encode_event_labeled = models.event.t.encoder(
+    models.event.json_fields, list_events.columns, prefix="events_")
+
+map_event = models.event.t.mapper(
+    models.event.json_fields, select_event.columns)
+
+map_inserted_event = models.event.t.mapper(
+    models.event.json_fields, insert_event.columns)
 
 
 class EventsController(HTTPMethodView):
 
-    default_listing = listing.Listing(1, 100, 25)
+    default_listing = listing.Listing(1, 100, 25, keys=[
+        ("start_date", listing.parse_date),
+        ("end_date", listing.parse_date),
+        ("created_at", listing.parse_datetime),
+        ("id", listing.parse_uuid)])
     """Limits and default options for events listing."""
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, connection):
-        """Returns a list of events."""
+        """Returns a list of events.
+
+        Events could be filtered by the creation time with
+        `created_after` and `created_before` arguments.
+        """
 
         # Validate listing
         try:
             pivot, limit, direction = \
                 self.default_listing.validate_from_request(request)
+            created = ids.created_range_from_request(request)
         except ValueError:
             return response.json(
                 response_wrapper.error("Listing arguments error"), status=400)
 
-        # Prepare query
-        query = (select([models.event.t])
-            .select_from(models.event.t)
-            .apply_labels())
-
-        # Adjust query according to listing options
-        if pivot is not None:
-            try:
-                query_pivot = query.where(models.event.t.c.id == pivot)
-                query_pivot, params = asyncpgsa.compile_query(query_pivot)
-
+        # Choose query according to listing options
+        if pivot is None:
+            if created is None:
+                query, params = list_events.bind(limit=limit)
+            else:
+                query, params = list_created_events.bind(
+                    limit=limit, **created)
+        else:
+            # Pivot is specified by ID, its sort keys have to be queried
+            if not isinstance(pivot, dict):
                 try:
-                    row = await connection.fetchrow(query_pivot, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                pivot = models.event.t.parse(row, prefix="events_")
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error("Pivot event not found"),
-                    status=400)
-
-            if direction == listing.Direction.BEFORE:
-                query = (query
-                    .where(
-                        (models.event.t.c.start_date > pivot["start_date"])
-                        | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date < pivot["end_date"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at < pivot["created_at"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at == pivot["created_at"])
-                            & (models.event.t.c.id > pivot["id"])
-                        )
-                    ))
-            elif direction == listing.Direction.AFTER:
-                query = (query
-                    .where(
-                        (models.event.t.c.start_date < pivot["start_date"])
-                        | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date > pivot["end_date"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at > pivot["created_at"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at == pivot["created_at"])
-                            & (models.event.t.c.id < pivot["id"])
-                        )
-                    ))
-
-        # Apply sorting and limit
-        if direction == listing.Direction.BEFORE:
-            query = (query
-                .order_by(models.event.t.c.start_date.asc())
-                .order_by(models.event.t.c.end_date.desc())
-                .order_by(models.event.t.c.created_at.desc())
-                .order_by(models.event.t.c.id.asc())
-                .limit(limit))
-        elif direction == listing.Direction.AFTER:
-            query = (query
-                .order_by(models.event.t.c.start_date.desc())
-                .order_by(models.event.t.c.end_date.asc())
-                .order_by(models.event.t.c.created_at.asc())
-                .order_by(models.event.t.c.id.desc())
-                .limit(limit))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+                    query_pivot, params = select_event_labeled.bind(id=pivot)
+
+                    try:
+                        row = await connection.fetchrow(query_pivot, *params)
+                    except PostgresError:
+                        raise exceptions.NotFetchedError
+
+                    if not row:
+                        raise exceptions.NotFoundError
+
+                    pivot = models.event.t.parse(row, prefix="events_")
+                except exceptions.NotFoundError:
+                    return response.json(
+                        response_wrapper.error("Pivot event not found"),
+                        status=400)
+
+            if created is None:
+                if direction == listing.Direction.BEFORE:
+                    template = list_events_before
+                elif direction == listing.Direction.AFTER:
+                    template = list_events_after
+
+                query, params = template.bind(limit=limit, **pivot)
+            else:
+                if direction == listing.Direction.BEFORE:
+                    template = list_created_events_before
+                elif direction == listing.Direction.AFTER:
+                    template = list_created_events_after
+
+                query, params = template.bind(limit=limit, **pivot, **created)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        events = [
-            models.event.json_format(models.event.t.parse(row, prefix="events_"))
-            for row in rows
-        ]
-
         if direction == listing.Direction.BEFORE:
-            events.reverse()
+            rows.reverse()
+
+        events = (encode_event_labeled(row) for row in rows)
+
+        cursors = self.default_listing.cursors(rows, prefix="events_")
 
         # Return the list
-        return response.json(response_wrapper.ok(events))
+        return response.raw(response_wrapper.ok_list(events, cursors),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, connection):
         """Creates a new event."""
 
         # Event form
         event = request.json
 
-        # Create a transaction
-        # We need to 1) save event, 2) fetch event from a database
-        async with connection.transaction():
-            try:
-                query = (models.event.t
-                    .insert()
-                    .values(name=event["name"],
-                            description=event["description"],
-                            start_date=pendulum.parse(event["start_date"]),
-                            end_date=pendulum.parse(event["end_date"]))
-                    .returning(models.event.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.event.t])
-                    .select_from(models.event.t)
-                    .where(models.event.t.c.id == id)
-                    .apply_labels())
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
+        # Save event, the saved row is returned at once
+        query, params = insert_event.bind(
+            name=event["name"],
+            description=event["description"],
+            start_date=pendulum.parse(event["start_date"]),
+            end_date=pendulum.parse(event["end_date"]))
 
-                if not row:
-                    raise exceptions.NotFoundError
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
 
-                event = models.event.json_format(
-                    models.event.t.parse(row, prefix="events_"))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        event = map_inserted_event(row)
 
         return response.json(response_wrapper.ok(event), status=201)
 
 
 class EventController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, event_id, connection):
         """Returns an event."""
 
-        # Prepare query
-        query = (select([models.event.t])
-            .select_from(models.event.t)
-            .where(models.event.t.c.id == event_id))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Bind query, execute and parse
+        query, params = select_event.bind(id=event_id)
         try:
             try:
                 row = await connection.fetchrow(query, *params)
@@ -200,7 +229,7 @@ class EventController(HTTPMethodView):
                 response_wrapper.error("Event not found"),
                 status=404)
 
-        event = models.event.json_format(models.event.t.parse(row))
+        event = map_event(row)
 
         # Return the event
         return response.json(response_wrapper.ok(event))
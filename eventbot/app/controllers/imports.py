@@ -0,0 +1,148 @@
+"""
+Event Bot Server
+"""
+
+import uuid
+from typing import Iterator
+
+import pendulum
+from asyncpg.exceptions import PostgresError
+from sanic import response
+from sanic.views import HTTPMethodView
+
+from eventbot.app import models
+from eventbot.app import helpers
+from eventbot.app.ids import reserve_ids
+from eventbot.lib import exceptions
+from eventbot.lib import response_wrapper
+
+
+# Things, which get new IDs, by the import data key
+things = ["persons", "locations", "tags", "sessions"]
+
+# Linked things of sessions, by the import data key
+links = [
+    ("persons", models.session_person.t, "person_id"),
+    ("locations", models.session_location.t, "location_id"),
+    ("tags", models.session_tag.t, "tag_id")
+]
+
+
+def prepare(event_id: uuid.UUID, data: dict,
+            new_ids: Iterator[uuid.UUID]):
+    """Returns new IDs of things, by their import-local IDs, and records
+    to copy into each table. New IDs are taken from the iterator.
+
+    Raises KeyError, TypeError or ValueError, if the data is malformed.
+    """
+    ids = {
+        name: {key: next(new_ids) for key in data[name]}
+        for name in things
+    }
+    now = pendulum.now()
+
+    records = [
+        (models.person.t, [
+            (ids["persons"][key], event_id, person["name"])
+            for key, person in data["persons"].items()
+        ]),
+        (models.location.t, [
+            (ids["locations"][key], event_id, location["name"])
+            for key, location in data["locations"].items()
+        ]),
+        (models.tag.t, [
+            (ids["tags"][key], event_id, tag["name"], tag.get("color"))
+            for key, tag in data["tags"].items()
+        ]),
+        (models.session.t, [
+            (ids["sessions"][key], event_id,
+             session["title"],
+             session["description"],
+             pendulum.parse(session["start_time"]),
+             pendulum.parse(session["end_time"]),
+             now)
+            for key, session in data["sessions"].items()
+        ])
+    ]
+
+    # Links are deduplicated, unknown local IDs are the data errors. Local
+    # IDs are compared as str, as keys of JSON objects are always str
+    for name, table, _ in links:
+        records.append((table, list({
+            (ids["sessions"][key], ids[name][str(id)])
+            for key, adds in data.get("sessions_adds", {}).items()
+            for id in adds.get(name, ())
+        })))
+
+    return ids, records
+
+
+class EventImportController(HTTPMethodView):
+
+    @helpers.db_connections.provide_connection(lazy=True)
+    async def post(self, request, event_id, connection):
+        """Imports persons, locations, tags and sessions of the event,
+        with links of sessions, at once.
+
+        Things are specified with the import-local IDs, in the same
+        format, as the database seeder uses. Returns new IDs of things,
+        by their local IDs.
+        """
+
+        # Malformed event ID is not found, as in the other event routes
+        try:
+            event_uuid = uuid.UUID(event_id)
+        except ValueError:
+            return response.json(
+                response_wrapper.error("Event not found"),
+                status=404)
+
+        # Import form
+        data = request.json
+
+        try:
+            # IDs are reserved in a single block
+            new_ids = await reserve_ids(sum(len(data[name]) for name in things))
+            ids, records = prepare(event_uuid, data, iter(new_ids))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return response.json(
+                response_wrapper.error("Import data error"),
+                status=400)
+
+        # Empty import does not change the event, so its version is kept
+        changed = any(table_records for _, table_records in records)
+
+        # Everything is loaded in a single transaction, event version is
+        # bumped first, so the event row is locked until the end
+        async with connection.transaction():
+            if changed:
+                version = await helpers.caches.bump_event_version(
+                    event_id, connection)
+            else:
+                version = await helpers.caches.get_event_version(
+                    event_id, connection)
+
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
+
+            try:
+                for table, table_records in records:
+                    if table_records:
+                        await connection.copy_records_to_table(
+                            table.name,
+                            records=table_records,
+                            columns=[column.name for column in table.columns])
+            except PostgresError:
+                raise exceptions.NotCreatedError
+
+        # Event version covers all of its sub-resources
+        if changed:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, version)
+
+        return response.json(response_wrapper.ok({
+            name: {key: str(id) for key, id in local_ids.items()}
+            for name, local_ids in ids.items()
+        }), status=201)
@@ -2,7 +2,7 @@
 Event Bot Server
 """
 
-import asyncpgsa
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
@@ -13,118 +13,94 @@ from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+# Precompiled queries
+
+insert_location = Template("locations.insert", models.location.t
+    .insert()
+    .values(event_id=sa.bindparam("event_id"),
+            name=sa.bindparam("name"))
+    .returning(*models.location.t.c))
+
+list_locations = Template("locations.list", select([models.location.t])
+    .select_from(models.location.t)
+    .where(models.location.t.c.event_id == sa.bindparam("event_id"))
+    .order_by(models.location.t.c.name.asc())
+    .order_by(models.location.t.c.id.desc())
+    .apply_labels())
+
+
+# Precompiled record mappers and encoders
+
+map_location = models.location.t.mapper(
+    models.location.json_fields, insert_location.columns)
+
+encode_location = models.location.t.encoder(
+    models.location.json_fields, list_locations.columns, prefix="locations_")
 
 
 class LocationsController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
+    @helpers.conditional.event_etag()
     async def get(self, request, event_id, connection):
-        """Returns a list of event locations."""
+        """Returns a list of event locations.
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        The list is streamed, if the client has opted in.
+        """
 
-            try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
-
-            if not row:
-                raise exceptions.NotFoundError
-
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
-
-        # If event exists, query all locations
-        query = (select([models.location.t])
-            .select_from(models.location.t)
-            .where(models.location.t.c.event_id == event["id"])
-            .order_by(models.location.t.c.name.asc())
-            .order_by(models.location.t.c.id.desc())
-            .apply_labels())
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Event existence is already checked by the conditional decorator
+        if helpers.streaming.is_requested(request):
+            query, params = list_locations.bind(event_id=event_id)
+            return helpers.streaming.list_response(request, query, params,
+                                                   encode_location)
+
+        # Query all locations
+        query, params = list_locations.bind(event_id=event_id)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        locations = [
-            models.location.json_format(models.location.t.parse(row, prefix="locations_"))
-            for row in rows
-        ]
+        locations = (encode_location(row) for row in rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(locations))
+        return response.raw(response_wrapper.ok_list(locations),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, event_id, connection):
         """Creates a new event location."""
 
         # Location form
         location = request.json
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        # Create a transaction
+        # We need to 1) bump event version, which also checks, is event
+        # exists, 2) save location
+        async with connection.transaction():
+            version = await helpers.caches.bump_event_version(
+                event_id, connection, helpers.caches.LOCATIONS)
+
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
 
             try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
+                query, params = insert_location.bind(event_id=event_id,
+                                                     name=location["name"])
 
-            if not row:
-                raise exceptions.NotFoundError
+                row = await connection.fetchrow(query, *params)
+            except PostgresError:
+                raise exceptions.NotCreatedError
 
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
+        location = map_location(row)
 
-        # If event exists, create a transaction
-        # We need to 1) save location, 2) fetch location from a database
-        async with connection.transaction():
-            try:
-                query = (models.location.t
-                    .insert()
-                    .values(event_id=event["id"],
-                            name=location["name"])
-                    .returning(models.location.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.location.t])
-                    .select_from(models.location.t)
-                    .where(models.location.t.c.id == id)
-                    .apply_labels())
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                location = models.location.json_format(
-                    models.location.t.parse(row, prefix="locations_"))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        helpers.caches.invalidate(helpers.caches.LOCATIONS, event_id, version)
 
         return response.json(response_wrapper.ok(location), status=201)
@@ -2,7 +2,7 @@
 Event Bot Server
 """
 
-import asyncpgsa
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
@@ -13,118 +13,94 @@ from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+# Precompiled queries
+
+insert_person = Template("persons.insert", models.person.t
+    .insert()
+    .values(event_id=sa.bindparam("event_id"),
+            name=sa.bindparam("name"))
+    .returning(*models.person.t.c))
+
+list_persons = Template("persons.list", select([models.person.t])
+    .select_from(models.person.t)
+    .where(models.person.t.c.event_id == sa.bindparam("event_id"))
+    .order_by(models.person.t.c.name.asc())
+    .order_by(models.person.t.c.id.desc())
+    .apply_labels())
+
+
+# Precompiled record mappers and encoders
+
+map_person = models.person.t.mapper(
+    models.person.json_fields, insert_person.columns)
+
+encode_person = models.person.t.encoder(
+    models.person.json_fields, list_persons.columns, prefix="persons_")
 
 
 class PersonsController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
+    @helpers.conditional.event_etag()
     async def get(self, request, event_id, connection):
-        """Returns a list of event persons."""
+        """Returns a list of event persons.
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        The list is streamed, if the client has opted in.
+        """
 
-            try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
-
-            if not row:
-                raise exceptions.NotFoundError
-
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
-
-        # If event exists, query all persons
-        query = (select([models.person.t])
-            .select_from(models.person.t)
-            .where(models.person.t.c.event_id == event["id"])
-            .order_by(models.person.t.c.name.asc())
-            .order_by(models.person.t.c.id.desc())
-            .apply_labels())
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Event existence is already checked by the conditional decorator
+        if helpers.streaming.is_requested(request):
+            query, params = list_persons.bind(event_id=event_id)
+            return helpers.streaming.list_response(request, query, params,
+                                                   encode_person)
+
+        # Query all persons
+        query, params = list_persons.bind(event_id=event_id)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        persons = [
-            models.person.json_format(models.person.t.parse(row, prefix="persons_"))
-            for row in rows
-        ]
+        persons = (encode_person(row) for row in rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(persons))
+        return response.raw(response_wrapper.ok_list(persons),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, event_id, connection):
         """Creates a new event person."""
 
         # Person form
         person = request.json
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        # Create a transaction
+        # We need to 1) bump event version, which also checks, is event
+        # exists, 2) save person
+        async with connection.transaction():
+            version = await helpers.caches.bump_event_version(
+                event_id, connection, helpers.caches.PERSONS)
+
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
 
             try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
+                query, params = insert_person.bind(event_id=event_id,
+                                                   name=person["name"])
 
-            if not row:
-                raise exceptions.NotFoundError
+                row = await connection.fetchrow(query, *params)
+            except PostgresError:
+                raise exceptions.NotCreatedError
 
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
+        person = map_person(row)
 
-        # If event exists, create a transaction
-        # We need to 1) save person, 2) fetch person from a database
-        async with connection.transaction():
-            try:
-                query = (models.person.t
-                    .insert()
-                    .values(event_id=event["id"],
-                            name=person["name"])
-                    .returning(models.person.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.person.t])
-                    .select_from(models.person.t)
-                    .where(models.person.t.c.id == id)
-                    .apply_labels())
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                person = models.person.json_format(
-                    models.person.t.parse(row, prefix="persons_"))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        helpers.caches.invalidate(helpers.caches.PERSONS, event_id, version)
 
         return response.json(response_wrapper.ok(person), status=201)
@@ -2,7 +2,7 @@
 Event Bot Server
 """
 
-import asyncpgsa
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
@@ -14,14 +14,59 @@ from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import listing
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+# Precompiled queries
+
+select_platform = Template("platforms.select", select([models.platform.t])
+    .select_from(models.platform.t)
+    .where(models.platform.t.c.id == sa.bindparam("id")))
+
+insert_platform = Template("platforms.insert", models.platform.t
+    .insert()
+    .values(slug=sa.bindparam("slug"),
+            name=sa.bindparam("name"))
+    .returning(*models.platform.t.c))
+
+keyset = listing.Keyset(*models.platform.listing_order)
+"""Keyset pagination of platforms."""
+
+list_platforms = Template("platforms.list", keyset
+    .page(select([models.platform.t])
+          .select_from(models.platform.t))
+    .limit(sa.bindparam("limit")))
+
+list_platforms_before = Template("platforms.list_before", keyset
+    .page(select([models.platform.t])
+          .select_from(models.platform.t),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit")))
+
+list_platforms_after = Template("platforms.list_after", keyset
+    .page(select([models.platform.t])
+          .select_from(models.platform.t),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit")))
+
+
+# Precompiled record mappers and encoders
+
+map_platform = models.platform.t.mapper(
+    models.platform.json_fields, insert_platform.columns)
+
+encode_platform = models.platform.t.encoder(
+    models.platform.json_fields, list_platforms.columns)
 
 
 class PlatformsController(HTTPMethodView):
 
-    default_listing = listing.Listing(1, 100, 25)
+    default_listing = listing.Listing(1, 100, 25, keys=[
+        ("slug", str),
+        ("id", listing.parse_uuid)])
     """Limits and default options for platforms listing."""
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, connection):
         """Returns a list of platforms."""
         # Validate listing
@@ -32,114 +77,69 @@ class PlatformsController(HTTPMethodView):
             return response.json(
                 response_wrapper.error("Listing arguments error"), status=400)
 
-        # Prepare query
-        query = select([models.platform.t]).select_from(models.platform.t)
-
-        # Adjust query according to listing options
-        if pivot is not None:
-            try:
-                query_pivot = query.where(models.platform.t.c.id == pivot)
-                query_pivot, params = asyncpgsa.compile_query(query_pivot)
-
+        # Choose query according to listing options
+        if pivot is None:
+            query, params = list_platforms.bind(limit=limit)
+        else:
+            # Pivot is specified by ID, its sort keys have to be queried
+            if not isinstance(pivot, dict):
                 try:
-                    row = await connection.fetchrow(query_pivot, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
+                    query_pivot, params = select_platform.bind(id=pivot)
 
-                if not row:
-                    raise exceptions.NotFoundError
+                    try:
+                        row = await connection.fetchrow(query_pivot, *params)
+                    except PostgresError:
+                        raise exceptions.NotFetchedError
 
-                pivot = models.platform.t.parse(row)
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error("Pivot platform not found"),
-                    status=400)
+                    if not row:
+                        raise exceptions.NotFoundError
+
+                    pivot = models.platform.t.parse(row)
+                except exceptions.NotFoundError:
+                    return response.json(
+                        response_wrapper.error("Pivot platform not found"),
+                        status=400)
 
             if direction == listing.Direction.BEFORE:
-                query = (query
-                    .where(
-                        (models.platform.t.c.slug < pivot["slug"])
-                        | (
-                            (models.platform.t.c.slug == pivot["slug"])
-                            & (models.platform.t.c.id > pivot["id"])
-                        )
-                    ))
+                template = list_platforms_before
             elif direction == listing.Direction.AFTER:
-                query = (query
-                    .where(
-                        (models.platform.t.c.slug > pivot["slug"])
-                        | (
-                            (models.platform.t.c.slug == pivot["slug"])
-                            & (models.platform.t.c.id < pivot["id"])
-                        )
-                    ))
-
-        # Apply sorting and limit
-        if direction == listing.Direction.BEFORE:
-            query = (query
-                .order_by(models.platform.t.c.slug.desc())
-                .order_by(models.platform.t.c.id.asc())
-                .limit(limit))
-        elif direction == listing.Direction.AFTER:
-            query = (query
-                .order_by(models.platform.t.c.slug.asc())
-                .order_by(models.platform.t.c.id.desc())
-                .limit(limit))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+                template = list_platforms_after
+
+            query, params = template.bind(limit=limit, **pivot)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        platforms = [
-            models.platform.json_format(models.platform.t.parse(row))
-            for row in rows
-        ]
-
         if direction == listing.Direction.BEFORE:
-            platforms.reverse()
+            rows.reverse()
+
+        platforms = (encode_platform(row) for row in rows)
+
+        cursors = self.default_listing.cursors(rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(platforms))
+        return response.raw(response_wrapper.ok_list(platforms, cursors),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, connection):
         """Creates a new platform."""
 
         # Platform form
         platform = request.json
 
-        # Create a transaction
-        # We need to 1) save platform, 2) fetch platform from a database
-        async with connection.transaction():
-            try:
-                query = (models.platform.t
-                    .insert()
-                    .values(slug=platform["slug"],
-                            name=platform["name"])
-                    .returning(models.platform.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
+        # Save platform, the saved row is returned at once
+        query, params = insert_platform.bind(slug=platform["slug"],
+                                             name=platform["name"])
 
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.platform.t])
-                    .select_from(models.platform.t)
-                    .where(models.platform.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
 
-                platform = models.platform.json_format(
-                    models.platform.t.parse(row))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        platform = map_platform(row)
 
         return response.json(response_wrapper.ok(platform), status=201)
@@ -3,368 +3,608 @@ Event Bot Server
 """
 
 import asyncio
+import uuid
 
-import asyncpgsa
 import pendulum
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
 from sanic.views import HTTPMethodView
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql import select
 
 from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+from eventbot.lib.sqlalchemy.types import GUID
+
+
+# Precompiled queries
+
+# Aggregated persons, locations and tags ids of each session
+session_links = [
+    (select([sa.func.array_agg(model.t.c[field])])
+        .where(model.t.c.session_id == models.session.t.c.id)
+        .as_scalar()
+        .label(name))
+    for name, field, model in [
+        ("sessions_persons", "person_id", models.session_person),
+        ("sessions_locations", "location_id", models.session_location),
+        ("sessions_tags", "tag_id", models.session_tag)
+    ]
+]
+
+# Event with all of its sessions at once, each session row carries
+# aggregated persons, locations and tags ids. Event is joined from the
+# left, so an existing event w/o sessions still returns a single row
+# with empty session columns.
+select_schedule = Template("sessions.select_schedule",
+    select([models.event.t.c.id, models.session.t] + session_links)
+    .select_from(models.event.t.outerjoin(
+        models.session.t,
+        models.session.t.c.event_id == models.event.t.c.id
+    ))
+    .where(models.event.t.c.id == sa.bindparam("event_id"))
+    .order_by(models.session.t.c.start_time.asc())
+    .order_by(models.session.t.c.end_time.asc())
+    .order_by(models.session.t.c.created_at.asc())
+    .order_by(models.session.t.c.id.desc())
+    .apply_labels())
+
+# Sessions only, for streaming of a schedule of the known event
+list_schedule_sessions = Template("sessions.list_schedule_sessions",
+    select([models.session.t] + session_links)
+    .select_from(models.session.t)
+    .where(models.session.t.c.event_id == sa.bindparam("event_id"))
+    .order_by(models.session.t.c.start_time.asc())
+    .order_by(models.session.t.c.end_time.asc())
+    .order_by(models.session.t.c.created_at.asc())
+    .order_by(models.session.t.c.id.desc())
+    .apply_labels())
+
+insert_session = Template("sessions.insert", models.session.t
+    .insert()
+    .values(event_id=sa.bindparam("event_id"),
+            title=sa.bindparam("title"),
+            description=sa.bindparam("description"),
+            start_time=sa.bindparam("start_time"),
+            end_time=sa.bindparam("end_time"))
+    .returning(*models.session.t.c))
+
+# Session of the event, links are changed only within the event, which
+# version is bumped
+session_exists = sa.exists() \
+    .where(models.session.t.c.id == sa.bindparam("session_id")) \
+    .where(models.session.t.c.event_id == sa.bindparam("event_id"))
+
+
+def bumped_version(changed: sa.sql.expression.CTE) -> sa.sql.ColumnElement:
+    """Returns the new event version, which is bumped and notified to all
+    workers, only if the data-modifying CTE has changed any link, or null
+    otherwise."""
+    bumped = (models.event.t
+        .update()
+        .values(version=models.event.t.c.version + 1)
+        .where(models.event.t.c.id == sa.bindparam("event_id"))
+        .where(sa.exists(select([changed.c.session_id])))
+        .returning(models.event.t.c.id, models.event.t.c.version)
+        .cte("bumped"))
+
+    # all workers are notified, when the statement commits
+    notified = (select([
+            bumped.c.version,
+            helpers.caches.notification(
+                sa.literal_column(f"'{helpers.caches.SESSIONS}'"),
+                bumped.c.id, bumped.c.version).label("notified")
+        ])
+        .select_from(bumped)
+        .cte("notified"))
+
+    return select([notified.c.version]).as_scalar()
+
+
+def delete_template(name: str, link: sa.Table,
+                    predicate: sa.sql.ClauseElement) -> Template:
+    """Returns a template, which deletes session links, matching the
+    predicate, if the session belongs to the event, and bumps the event
+    version, if any link is deleted. It returns, is the session exists
+    (``session_exists``) and the new event version (``version``), if
+    bumped."""
+    deleted = (link
+        .delete()
+        .where(link.c.session_id == sa.bindparam("session_id"))
+        .where(predicate)
+        .where(session_exists)
+        .returning(link.c.session_id)
+        .cte("deleted"))
+
+    return Template(f"sessions.delete_{name}", select([
+        session_exists.label("session_exists"),
+        bumped_version(deleted).label("version")
+    ]))
+
+
+delete_session_person = delete_template("person", models.session_person.t,
+    models.session_person.t.c.person_id == sa.bindparam("person_id"))
+
+delete_session_location = delete_template("location",
+    models.session_location.t,
+    models.session_location.t.c.location_id == sa.bindparam("location_id"))
+
+delete_session_tag = delete_template("tag", models.session_tag.t,
+    models.session_tag.t.c.tag_id == sa.bindparam("tag_id"))
+
+
+def link_templates(name: str, link: sa.Table, field: str, thing: sa.Table):
+    """Returns templates of a session links with a list of things: insert
+    and delete, see :func:`delete_template`.
+
+    Insert is a single statement, which adds links only if the session
+    of the event and all things exist, skips already existing links and bumps the
+    event version and notifies workers, if any link is added. It returns,
+    is the session exists (``session_exists``), the number of existing
+    things (``found``) and the new event version (``version``), if
+    bumped."""
+    ids = lambda: sa.bindparam("ids", type_=postgresql.ARRAY(GUID))
+
+    found = select([sa.func.count()]) \
+        .select_from(thing) \
+        .where(thing.c.id == sa.any_(ids())) \
+        .as_scalar()
+
+    inserted = (postgresql
+        .insert(link)
+        .from_select(["session_id", field], select([
+            sa.cast(sa.bindparam("session_id"), GUID),
+            thing.c.id
+        ])
+        .where(thing.c.id == sa.any_(ids()))
+        .where(session_exists)
+        .where(found == sa.func.cardinality(ids())))
+        .on_conflict_do_nothing()
+        .returning(link.c.session_id)
+        .cte("inserted"))
+
+    insert_links = Template(f"sessions.insert_{name}", select([
+        session_exists.label("session_exists"),
+        found.label("found"),
+        bumped_version(inserted).label("version")
+    ]))
+
+    delete_links = delete_template(name, link, link.c[field] == sa.any_(ids()))
+
+    return insert_links, delete_links
+
+
+insert_session_persons, delete_session_persons = \
+    link_templates("persons", models.session_person.t, "person_id",
+                   models.person.t)
+
+insert_session_locations, delete_session_locations = \
+    link_templates("locations", models.session_location.t, "location_id",
+                   models.location.t)
+
+insert_session_tags, delete_session_tags = \
+    link_templates("tags", models.session_tag.t, "tag_id", models.tag.t)
+
+
+# Precompiled record mappers and encoders
+
+encode_schedule_session = models.session.t.encoder(
+    models.session.schedule_json_fields, select_schedule.columns,
+    prefix="sessions_")
+
+encode_schedule_stream_session = models.session.t.encoder(
+    models.session.schedule_json_fields, list_schedule_sessions.columns,
+    prefix="sessions_")
+
+map_session = models.session.t.mapper(
+    models.session.json_fields, insert_session.columns)
 
 
 class SessionsController(HTTPMethodView):
     """Event schedule information controller."""
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
+    @helpers.conditional.event_etag()
     async def get(self, request, event_id, connection):
         """Returns a list of event sessions aka schedule.
 
         This endpoint returns complete list, w/o support of listing.
+        Serialized schedule is cached until the event sessions change.
+        Uncached schedule is streamed, if the client has opted in.
         """
+        cache = helpers.caches.get_schedule_cache()
+        key = helpers.caches.event_key(event_id)
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        body = cache.get(key)
+        if body is not None:
+            return response.raw(body, content_type="application/json")
 
-            try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
+        # Event existence is already checked by the conditional decorator
+        if helpers.streaming.is_requested(request):
+            query, params = list_schedule_sessions.bind(event_id=event_id)
+            return helpers.streaming.list_response(
+                request, query, params, encode_schedule_stream_session)
 
-            if not row:
-                raise exceptions.NotFoundError
+        # Remember the version before querying, so the schedule will not
+        # be cached, if it has been changed in the meantime
+        version = cache.version(key)
 
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
+        # Schedule is not cached, while invalidation messages could be
+        # missed
+        schedule = await self.get_schedule(event_id, connection)
+        if schedule.status == 200 and helpers.caches.is_listening():
+            cache.set(key, schedule.body, version)
+
+        return schedule
 
-        # If event exists, query all sessions
-        query = (select([models.session.t])
-            .select_from(models.session.t)
-            .where(models.session.t.c.event_id == event["id"])
-            .order_by(models.session.t.c.start_time.asc())
-            .order_by(models.session.t.c.end_time.asc())
-            .order_by(models.session.t.c.created_at.asc())
-            .order_by(models.session.t.c.id.desc())
-            .apply_labels())
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+    async def get_schedule(self, event_id, connection):
+        """Returns a list of event sessions, queried from a database."""
+
+        # Bind query, execute and parse
+        query, params = select_schedule.bind(event_id=event_id)
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        sessions = [
-            models.session.json_format(models.session.t.parse(row, prefix="sessions_"))
-            for row in rows
-        ]
-
-        # Construct sessions map for fetching persons, locations and tags
-        smap = {session["id"]: session for session in sessions}
-        sids = list(smap.keys())
-
-        # Query all persons, locations and tags ids for sessions
-        # TODO: Optimizations
-        for name, field, model in [
-            ("persons", "person_id", models.session_person),
-            ("locations", "location_id", models.session_location),
-            ("tags", "tag_id", models.session_tag)
-        ]:
-            for session in sessions:
-                session[name] = []
-
-            query = (select([model.t])
-                .select_from(model.t)
-                .where(model.t.c.session_id.in_(sids)))  # Probably, hot spot
-
-            query, params = asyncpgsa.compile_query(query)
-            try:
-                rows = await connection.fetch(query, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
+        if not rows:
+            return response.json(
+                response_wrapper.error("Event not found"),
+                status=404)
 
-            rows = [model.t.parse(row) for row in rows]
-            for row in rows:
-                smap[str(row["session_id"])][name].append(str(row[field]))
+        sessions = (
+            encode_schedule_session(row)
+            for row in rows if row["sessions_id"] is not None
+        )
 
         # Return the list
-        return response.json(response_wrapper.ok(sessions))
+        return response.raw(response_wrapper.ok_list(sessions),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, event_id, connection):
         """Creates a new event session."""
 
         # Session form
         session = request.json
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
-
-            try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
-
-            if not row:
-                raise exceptions.NotFoundError
+        # Create a transaction
+        # We need to 1) bump event version, which also checks, is event
+        # exists, 2) save session
+        async with connection.transaction():
+            version = await helpers.caches.bump_event_version(
+                event_id, connection)
 
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
 
-        # If event exists, create a transaction
-        # We need to 1) save session, 2) fetch session from a database
-        async with connection.transaction():
             try:
-                query = (models.session.t
-                    .insert()
-                    .values(event_id=event["id"],
-                            title=session["title"],
-                            description=session["description"],
-                            start_time=pendulum.parse(session["start_time"]),
-                            end_time=pendulum.parse(session["end_time"]))
-                    .returning(models.session.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.session.t])
-                    .select_from(models.session.t)
-                    .where(models.session.t.c.id == id)
-                    .apply_labels())
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                session = models.session.json_format(
-                    models.session.t.parse(row, prefix="sessions_"))
-            except (PostgresError, exceptions.DatabaseError):
+                query, params = insert_session.bind(
+                    event_id=event_id,
+                    title=session["title"],
+                    description=session["description"],
+                    start_time=pendulum.parse(session["start_time"]),
+                    end_time=pendulum.parse(session["end_time"]))
+
+                row = await connection.fetchrow(query, *params)
+            except PostgresError:
                 raise exceptions.NotCreatedError
 
+        session = map_session(row)
+
         for name in ["persons", "locations", "tags"]:
             session[name] = []
 
+        helpers.caches.invalidate(helpers.caches.SESSIONS, event_id, version)
+
         return response.json(response_wrapper.ok(session), status=201)
 
 
 class SessionLocationController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def put(self, request, event_id, session_id, location_id, connection):
         """Adds location to event session."""
 
-        # Check, is session and location exists
-        for name, model, id in [
-            ("Session", models.session, session_id),
-            ("Location", models.location, location_id)
-        ]:
-            try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error(f"{name} not found"),
-                    status=404)
+        # Add location to session, if session and location exist
+        query, params = insert_session_locations.bind(
+            event_id=event_id, session_id=session_id, ids=[location_id])
 
-        # If all is ok, add location to session
-        query = (models.session_location.t
-            .insert()
-            .values(session_id=session_id,
-                    location_id=location_id))
-
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotCreatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        if not row["found"]:
+            return response.json(
+                response_wrapper.error("Location not found"),
+                status=404)
+
+        # Already added location does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def delete(self, request, event_id, session_id, location_id,
                      connection):
         """Removes location from event session."""
 
-        query = (models.session_location.t
-            .delete()
-            .where(models.session_location.t.c.session_id == session_id)
-            .where(models.session_location.t.c.location_id == location_id))
+        query, params = delete_session_location.bind(
+            event_id=event_id, session_id=session_id, location_id=location_id)
 
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotUpdatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        # Already removed location does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
 
 class SessionPersonController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def put(self, request, event_id, session_id, person_id, connection):
         """Adds person to event session."""
 
-        # Check, is session and person exists
-        for name, model, id in [
-            ("Session", models.session, session_id),
-            ("Person", models.person, person_id)
-        ]:
-            try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error(f"{name} not found"),
-                    status=404)
-
-        # If all is ok, add person to session
-        query = (models.session_person.t
-            .insert()
-            .values(session_id=session_id,
-                    person_id=person_id))
+        # Add person to session, if session and person exist
+        query, params = insert_session_persons.bind(
+            event_id=event_id, session_id=session_id, ids=[person_id])
 
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotCreatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        if not row["found"]:
+            return response.json(
+                response_wrapper.error("Person not found"),
+                status=404)
+
+        # Already added person does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def delete(self, request, event_id, session_id, person_id,
                      connection):
         """Removes person from event session."""
 
-        query = (models.session_person.t
-            .delete()
-            .where(models.session_person.t.c.session_id == session_id)
-            .where(models.session_person.t.c.person_id == person_id))
+        query, params = delete_session_person.bind(
+            event_id=event_id, session_id=session_id, person_id=person_id)
 
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotUpdatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        # Already removed person does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
 
 class SessionTagController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def put(self, request, event_id, session_id, tag_id, connection):
         """Adds tag to event session."""
 
-        # Check, is session and tag exists
-        for name, model, id in [
-            ("Session", models.session, session_id),
-            ("Tag", models.tag, tag_id)
-        ]:
-            try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error(f"{name} not found"),
-                    status=404)
+        # Add tag to session, if session and tag exist
+        query, params = insert_session_tags.bind(
+            event_id=event_id, session_id=session_id, ids=[tag_id])
 
-        # If all is ok, add tag to session
-        query = (models.session_tag.t
-            .insert()
-            .values(session_id=session_id,
-                    tag_id=tag_id))
-
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotCreatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        if not row["found"]:
+            return response.json(
+                response_wrapper.error("Tag not found"),
+                status=404)
+
+        # Already added tag does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def delete(self, request, event_id, session_id, tag_id, connection):
         """Removes tag from event session."""
 
-        query = (models.session_tag.t
-            .delete()
-            .where(models.session_tag.t.c.session_id == session_id)
-            .where(models.session_tag.t.c.tag_id == tag_id))
+        query, params = delete_session_tag.bind(
+            event_id=event_id, session_id=session_id, tag_id=tag_id)
+
+        # Execute
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotUpdatedError
+
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        # Already removed tag does not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
+        # Return the HTTP 204
+        return response.text("", content_type="application/json", status=204)
+
+
+class SessionLinksController(HTTPMethodView):
+    """Links of event session with a list of things at once.
+
+    List of IDs is passed as ``{"ids": [...]}``."""
+
+    name = None
+    """Name of a linked thing, used in error messages."""
+
+    insert_links = None
+    delete_links = None
+    """Templates, returned by :func:`link_templates`."""
+
+    @staticmethod
+    def validate_ids(form) -> list:
+        """Returns the list of distinct IDs from the form."""
+        try:
+            return list({str(uuid.UUID(id)) for id in form["ids"]})
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise exceptions.ValidationError
+
+    @helpers.db_connections.provide_connection(lazy=True)
+    async def put(self, request, event_id, session_id, connection):
+        """Adds things to event session.
+
+        Already added things are skipped."""
+
+        try:
+            ids = self.validate_ids(request.json)
+        except exceptions.ValidationError:
+            return response.json(
+                response_wrapper.error("IDs list error"),
+                status=400)
+
+        # Add things to session, if session and all things exist
+        query, params = self.insert_links.bind(event_id=event_id,
+                                               session_id=session_id,
+                                               ids=ids)
 
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
-            rows = await connection.execute(query, *params)
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
+
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        if row["found"] != len(ids):
+            return response.json(
+                response_wrapper.error(f"{self.name} not found"),
+                status=404)
+
+        # Already added things do not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
+        # Return the HTTP 204
+        return response.text("", content_type="application/json", status=204)
+
+    @helpers.db_connections.provide_connection(lazy=True)
+    async def delete(self, request, event_id, session_id, connection):
+        """Removes things from event session."""
+
+        try:
+            ids = self.validate_ids(request.json)
+        except exceptions.ValidationError:
+            return response.json(
+                response_wrapper.error("IDs list error"),
+                status=400)
+
+        query, params = self.delete_links.bind(event_id=event_id,
+                                               session_id=session_id,
+                                               ids=ids)
+
+        # Execute
+        try:
+            row = await connection.fetchrow(query, *params)
         except PostgresError:
             raise exceptions.NotUpdatedError
 
+        if not row["session_exists"]:
+            return response.json(
+                response_wrapper.error("Session not found"),
+                status=404)
+
+        # Already removed things do not change the event
+        if row["version"] is not None:
+            helpers.caches.invalidate(
+                helpers.caches.SESSIONS, event_id, row["version"])
+
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
+
+
+class SessionLocationsController(SessionLinksController):
+
+    name = "Location"
+    insert_links = insert_session_locations
+    delete_links = delete_session_locations
+
+
+class SessionPersonsController(SessionLinksController):
+
+    name = "Person"
+    insert_links = insert_session_persons
+    delete_links = delete_session_persons
+
+
+class SessionTagsController(SessionLinksController):
+
+    name = "Tag"
+    insert_links = insert_session_tags
+    delete_links = delete_session_tags
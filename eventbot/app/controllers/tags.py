@@ -2,7 +2,7 @@
 Event Bot Server
 """
 
-import asyncpgsa
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
@@ -13,119 +13,96 @@ from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+# Precompiled queries
+
+insert_tag = Template("tags.insert", models.tag.t
+    .insert()
+    .values(event_id=sa.bindparam("event_id"),
+            name=sa.bindparam("name"),
+            color=sa.bindparam("color"))
+    .returning(*models.tag.t.c))
+
+list_tags = Template("tags.list", select([models.tag.t])
+    .select_from(models.tag.t)
+    .where(models.tag.t.c.event_id == sa.bindparam("event_id"))
+    .order_by(models.tag.t.c.name.asc())
+    .order_by(models.tag.t.c.id.desc())
+    .apply_labels())
+
+
+# Precompiled record mappers and encoders
+
+map_tag = models.tag.t.mapper(
+    models.tag.json_fields, insert_tag.columns)
+
+encode_tag = models.tag.t.encoder(
+    models.tag.json_fields, list_tags.columns, prefix="tags_")
 
 
 class TagsController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
+    @helpers.conditional.event_etag()
     async def get(self, request, event_id, connection):
-        """Returns a list of event tags."""
+        """Returns a list of event tags.
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        The list is streamed, if the client has opted in.
+        """
 
-            try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
-
-            if not row:
-                raise exceptions.NotFoundError
-
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
-
-        # If event exists, query all tags
-        query = (select([models.tag.t])
-            .select_from(models.tag.t)
-            .where(models.tag.t.c.event_id == event["id"])
-            .order_by(models.tag.t.c.name.asc())
-            .order_by(models.tag.t.c.id.desc())
-            .apply_labels())
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Event existence is already checked by the conditional decorator
+        if helpers.streaming.is_requested(request):
+            query, params = list_tags.bind(event_id=event_id)
+            return helpers.streaming.list_response(request, query, params,
+                                                   encode_tag)
+
+        # Query all tags
+        query, params = list_tags.bind(event_id=event_id)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        tags = [
-            models.tag.json_format(models.tag.t.parse(row, prefix="tags_"))
-            for row in rows
-        ]
+        tags = (encode_tag(row) for row in rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(tags))
+        return response.raw(response_wrapper.ok_list(tags),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, event_id, connection):
         """Creates a new event tag."""
 
         # Tag form
         tag = request.json
 
-        # Check, is event exists
-        try:
-            query_event = (select([models.event.t])
-                .select_from(models.event.t)
-                .where(models.event.t.c.id == event_id)
-                .apply_labels())
-            query_event, params = asyncpgsa.compile_query(query_event)
+        # Create a transaction
+        # We need to 1) bump event version, which also checks, is event
+        # exists, 2) save tag
+        async with connection.transaction():
+            version = await helpers.caches.bump_event_version(
+                event_id, connection, helpers.caches.TAGS)
+
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
 
             try:
-                row = await connection.fetchrow(query_event, *params)
-            except PostgresError:
-                raise exceptions.NotFetchedError
+                query, params = insert_tag.bind(event_id=event_id,
+                                                name=tag["name"],
+                                                color=tag["color"])
 
-            if not row:
-                raise exceptions.NotFoundError
+                row = await connection.fetchrow(query, *params)
+            except PostgresError:
+                raise exceptions.NotCreatedError
 
-            event = models.event.t.parse(row, prefix="events_")
-        except exceptions.NotFoundError:
-            return response.json(
-                response_wrapper.error("Event not found"),
-                status=404)
+        tag = map_tag(row)
 
-        # If event exists, create a transaction
-        # We need to 1) save tag, 2) fetch tag from a database
-        async with connection.transaction():
-            try:
-                query = (models.tag.t
-                    .insert()
-                    .values(event_id=event["id"],
-                            name=tag["name"],
-                            color=tag["color"])
-                    .returning(models.tag.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.tag.t])
-                    .select_from(models.tag.t)
-                    .where(models.tag.t.c.id == id)
-                    .apply_labels())
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                tag = models.tag.json_format(
-                    models.tag.t.parse(row, prefix="tags_"))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        helpers.caches.invalidate(helpers.caches.TAGS, event_id, version)
 
         return response.json(response_wrapper.ok(tag), status=201)
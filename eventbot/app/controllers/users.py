@@ -2,158 +2,346 @@
 Event Bot Server
 """
 
-import asyncpgsa
+import sqlalchemy as sa
 from asyncpg.connection import Connection
 from asyncpg.exceptions import PostgresError
 from sanic import response
 from sanic.views import HTTPMethodView
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql import select
 
+from eventbot.app import ids
 from eventbot.app import models
 from eventbot.app import helpers
 from eventbot.lib import exceptions
 from eventbot.lib import listing
 from eventbot.lib import response_wrapper
+from eventbot.lib.sqlalchemy.templates import Template
+from eventbot.lib.sqlalchemy.types import GUID
+
+
+# Precompiled queries
+
+select_user = Template("users.select", select([models.user.t])
+    .select_from(models.user.t)
+    .where(models.user.t.c.id == sa.bindparam("id")))
+
+select_platform = Template("users.select_platform", select([models.platform.t])
+    .select_from(models.platform.t)
+    .where(models.platform.t.c.id == sa.bindparam("id")))
+
+insert_user = Template("users.insert", models.user.t
+    .insert()
+    .returning(*models.user.t.c))
+
+users_keyset = listing.Keyset(*models.user.listing_order)
+"""Keyset pagination of users."""
+
+events_keyset = listing.Keyset(*models.event.listing_order)
+"""Keyset pagination of saved events."""
+
+list_users = Template("users.list", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t))
+    .limit(sa.bindparam("limit")))
+
+list_users_before = Template("users.list_before", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit")))
+
+list_users_after = Template("users.list_after", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit")))
+
+# listings of users, created within a time range
+list_created_users = Template("users.list_created", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t)
+          .where(ids.created_between(models.user.t)))
+    .limit(sa.bindparam("limit")))
+
+list_created_users_before = Template("users.list_created_before", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t)
+          .where(ids.created_between(models.user.t)),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit")))
+
+list_created_users_after = Template("users.list_created_after", users_keyset
+    .page(select([models.user.t])
+          .select_from(models.user.t)
+          .where(ids.created_between(models.user.t)),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit")))
+
+select_user_by_platform = Template("users.select_by_platform",
+    select([models.user_platform.t, models.user.t])
+    .select_from(models.user_platform.t.join(
+        models.user.t,
+        models.user.t.c.id == models.user_platform.t.c.user_id
+    ))
+    .where(models.user_platform.t.c.platform_id == sa.bindparam("platform_id"))
+    .where(models.user_platform.t.c.user_platform_id ==
+           sa.bindparam("user_platform_id"))
+    .apply_labels())
+
+list_user_platforms = Template("users.list_user_platforms",
+    select([models.user_platform.t])
+    .select_from(models.user_platform.t)
+    .where(models.user_platform.t.c.user_id == sa.bindparam("user_id"))
+    .where(models.user_platform.t.c.platform_id == sa.bindparam("platform_id")))
+
+select_saved_event = Template("users.select_saved_event",
+    select([models.user_saved_event.t, models.event.t])
+    .select_from(models.user_saved_event.t.join(
+        models.event.t,
+        models.event.t.c.id == models.user_saved_event.t.c.event_id
+    ))
+    .where(models.user_saved_event.t.c.user_id == sa.bindparam("user_id"))
+    .where(models.event.t.c.id == sa.bindparam("id"))
+    .apply_labels())
+
+list_saved_events = Template("users.list_saved_events", events_keyset
+    .page(select([models.user_saved_event.t, models.event.t])
+          .select_from(models.user_saved_event.t.join(
+              models.event.t,
+              models.event.t.c.id == models.user_saved_event.t.c.event_id
+          ))
+          .where(models.user_saved_event.t.c.user_id ==
+                 sa.bindparam("user_id")))
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_saved_events_before = Template("users.list_saved_events_before",
+    events_keyset
+    .page(select([models.user_saved_event.t, models.event.t])
+          .select_from(models.user_saved_event.t.join(
+              models.event.t,
+              models.event.t.c.id == models.user_saved_event.t.c.event_id
+          ))
+          .where(models.user_saved_event.t.c.user_id ==
+                 sa.bindparam("user_id")),
+          listing.Direction.BEFORE)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+list_saved_events_after = Template("users.list_saved_events_after",
+    events_keyset
+    .page(select([models.user_saved_event.t, models.event.t])
+          .select_from(models.user_saved_event.t.join(
+              models.event.t,
+              models.event.t.c.id == models.user_saved_event.t.c.event_id
+          ))
+          .where(models.user_saved_event.t.c.user_id ==
+                 sa.bindparam("user_id")),
+          listing.Direction.AFTER)
+    .limit(sa.bindparam("limit"))
+    .apply_labels())
+
+# Saves event, only if user and event exist, already saved event is
+# skipped. Returns, are user (`user_exists`) and event (`event_exists`)
+# exist, and the number of saved events (`saved`).
+user_exists = sa.exists() \
+    .where(models.user.t.c.id == sa.bindparam("user_id"))
+
+event_exists = sa.exists() \
+    .where(models.event.t.c.id == sa.bindparam("event_id"))
+
+saved_event = (postgresql
+    .insert(models.user_saved_event.t)
+    .from_select(["user_id", "event_id", "saved_at"], select([
+        sa.cast(sa.bindparam("user_id"), GUID),
+        sa.cast(sa.bindparam("event_id"), GUID),
+        sa.func.now()
+    ])
+    .where(user_exists)
+    .where(event_exists))
+    .on_conflict_do_nothing()
+    .returning(models.user_saved_event.t.c.user_id)
+    .cte("saved_event"))
+
+insert_saved_event = Template("users.insert_saved_event", select([
+    user_exists.label("user_exists"),
+    event_exists.label("event_exists"),
+    select([sa.func.count()]).select_from(saved_event).as_scalar()
+    .label("saved")
+]))
+
+# Creates user's platform, only if user and platform exist. Returns, are
+# user (`user_exists`) and platform (`platform_exists`) exist, and the
+# created user's platform, which is null, if it is not created.
+platform_exists = sa.exists() \
+    .where(models.platform.t.c.id == sa.bindparam("platform_id"))
+
+created_user_platform = (models.user_platform.t
+    .insert()
+    .from_select(
+        ["user_id", "platform_id", "user_platform_id", "created_at"],
+        select([
+            sa.cast(sa.bindparam("user_id"), GUID),
+            sa.cast(sa.bindparam("platform_id"), GUID),
+            sa.cast(sa.bindparam("user_platform_id"), sa.String),
+            sa.func.now()
+        ])
+        .where(user_exists)
+        .where(platform_exists))
+    .returning(*models.user_platform.t.c)
+    .cte("created_user_platform"))
+
+user_platform_flags = select([
+    user_exists.label("user_exists"),
+    platform_exists.label("platform_exists")
+]).alias("flags")
+
+insert_user_platform = Template("users.insert_user_platform",
+    select([user_platform_flags, created_user_platform])
+    .select_from(user_platform_flags.outerjoin(created_user_platform,
+                                               sa.true())))
+
+delete_saved_event = Template("users.delete_saved_event",
+    models.user_saved_event.t
+    .delete()
+    .where(models.user_saved_event.t.c.user_id == sa.bindparam("user_id"))
+    .where(models.user_saved_event.t.c.event_id == sa.bindparam("event_id")))
+
+
+# Precompiled record mappers and encoders
+
+# all listing templates have the same result columns
+map_user = models.user.t.mapper(
+    models.user.json_fields, list_users.columns)
+
+map_user_by_platform = models.user.t.mapper(
+    models.user.json_fields, select_user_by_platform.columns,
+    prefix="users_")
+
+map_inserted_user = models.user.t.mapper(
+    models.user.json_fields, insert_user.columns)
+
+map_user_platform = models.user_platform.t.mapper(
+    models.user_platform.json_fields, insert_user_platform.columns)
+
+encode_user = models.user.t.encoder(
+    models.user.json_fields, list_users.columns)
+
+encode_user_platform = models.user_platform.t.encoder(
+    models.user_platform.json_fields, list_user_platforms.columns)
+
+encode_saved_event = models.event.t.encoder(
+    models.event.json_fields, list_saved_events.columns, prefix="events_")
 
 
 class UsersController(HTTPMethodView):
 
-    default_listing = listing.Listing(1, 100, 25)
+    default_listing = listing.Listing(1, 100, 25, keys=[
+        ("created_at", listing.parse_datetime),
+        ("id", listing.parse_uuid)])
     """Limits and default options for users listing."""
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, connection):
-        """Returns a list of users."""
+        """Returns a list of users.
+
+        Users could be filtered by the creation time with
+        `created_after` and `created_before` arguments.
+        """
         # Validate listing
         try:
             pivot, limit, direction = \
                 self.default_listing.validate_from_request(request)
+            created = ids.created_range_from_request(request)
         except ValueError:
             return response.json(
                 response_wrapper.error("Listing arguments error"), status=400)
 
-        # Prepare query
-        query = select([models.user.t]).select_from(models.user.t)
-
-        # Adjust query according to listing options
-        if pivot is not None:
-            try:
-                query_pivot = query.where(models.user.t.c.id == pivot)
-                query_pivot, params = asyncpgsa.compile_query(query_pivot)
-
+        # Choose query according to listing options
+        if pivot is None:
+            if created is None:
+                query, params = list_users.bind(limit=limit)
+            else:
+                query, params = list_created_users.bind(
+                    limit=limit, **created)
+        else:
+            # Pivot is specified by ID, its sort keys have to be queried
+            if not isinstance(pivot, dict):
                 try:
-                    row = await connection.fetchrow(query_pivot, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                pivot = models.user.t.parse(row)
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error("Pivot user not found"),
-                    status=400)
-
-            if direction == listing.Direction.BEFORE:
-                query = (query
-                    .where(
-                        (models.user.t.c.created_at > pivot["created_at"])
-                        | (
-                            (models.user.t.c.created_at == pivot["created_at"])
-                            & (models.user.t.c.id > pivot["id"])
-                        )
-                    ))
-            elif direction == listing.Direction.AFTER:
-                query = (query
-                    .where(
-                        (models.user.t.c.created_at < pivot["created_at"])
-                        | (
-                            (models.user.t.c.created_at == pivot["created_at"])
-                            & (models.user.t.c.id < pivot["id"])
-                        )
-                    ))
-
-        # Apply sorting and limit
-        if direction == listing.Direction.BEFORE:
-            query = (query
-                .order_by(models.user.t.c.created_at.asc())
-                .order_by(models.user.t.c.id.asc())
-                .limit(limit))
-        elif direction == listing.Direction.AFTER:
-            query = (query
-                .order_by(models.user.t.c.created_at.desc())
-                .order_by(models.user.t.c.id.desc())
-                .limit(limit))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+                    query_pivot, params = select_user.bind(id=pivot)
+
+                    try:
+                        row = await connection.fetchrow(query_pivot, *params)
+                    except PostgresError:
+                        raise exceptions.NotFetchedError
+
+                    if not row:
+                        raise exceptions.NotFoundError
+
+                    pivot = models.user.t.parse(row)
+                except exceptions.NotFoundError:
+                    return response.json(
+                        response_wrapper.error("Pivot user not found"),
+                        status=400)
+
+            if created is None:
+                if direction == listing.Direction.BEFORE:
+                    template = list_users_before
+                elif direction == listing.Direction.AFTER:
+                    template = list_users_after
+
+                query, params = template.bind(limit=limit, **pivot)
+            else:
+                if direction == listing.Direction.BEFORE:
+                    template = list_created_users_before
+                elif direction == listing.Direction.AFTER:
+                    template = list_created_users_after
+
+                query, params = template.bind(limit=limit, **pivot, **created)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        users = [
-            models.user.json_format(models.user.t.parse(row))
-            for row in rows
-        ]
-
         if direction == listing.Direction.BEFORE:
-            users.reverse()
+            rows.reverse()
+
+        users = (encode_user(row) for row in rows)
+
+        cursors = self.default_listing.cursors(rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(users))
+        return response.raw(response_wrapper.ok_list(users, cursors),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, connection):
         """Creates a new user."""
 
-        user = None
-
-        # Create a transaction
-        # We need to 1) save user, 2) fetch user from a database
-        async with connection.transaction():
-            try:
-                query = (models.user.t
-                    .insert()
-                    .returning(models.user.t.c.id))
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.user.t])
-                    .select_from(models.user.t)
-                    .where(models.user.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
+        # Save user, the saved row is returned at once
+        query, params = insert_user.bind()
 
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
 
-                user = models.user.json_format(models.user.t.parse(row))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        user = map_inserted_user(row)
 
         return response.json(response_wrapper.ok(user), status=201)
 
 
 class UserController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, user_id, connection):
         """Returns the user."""
 
-        # Prepare query
-        query = (select([models.user.t])
-            .select_from(models.user.t)
-            .where(models.user.t.c.id == user_id))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Bind query, execute and parse
+        query, params = select_user.bind(id=user_id)
         try:
             try:
                 row = await connection.fetchrow(query, *params)
@@ -167,7 +355,7 @@ class UserController(HTTPMethodView):
                 response_wrapper.error("User not found"),
                 status=404)
 
-        user = models.user.json_format(models.user.t.parse(row))
+        user = map_user(row)
 
         # Return the user
         return response.json(response_wrapper.ok(user))
@@ -175,16 +363,13 @@ class UserController(HTTPMethodView):
 
 class UserByPlatformController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, user_platform_id, platform_id, connection):
         """Returns the user."""
 
         # Check, is platform exists
         try:
-            query_platform = (select([models.platform.t])
-                .select_from(models.platform.t)
-                .where(models.platform.t.c.id == platform_id))
-            query_platform, params = asyncpgsa.compile_query(query_platform)
+            query_platform, params = select_platform.bind(id=platform_id)
 
             try:
                 row = await connection.fetchrow(query_platform, *params)
@@ -198,18 +383,10 @@ class UserByPlatformController(HTTPMethodView):
                 response_wrapper.error("Platform not found"),
                 status=400)
 
-        # Prepare query
-        query = (select([models.user_platform.t, models.user.t])
-            .select_from(models.user_platform.t.join(
-                models.user.t,
-                models.user.t.c.id == models.user_platform.t.c.user_id
-            ))
-            .where(models.user_platform.t.c.platform_id == platform_id)
-            .where(models.user_platform.t.c.user_platform_id == user_platform_id)
-            .apply_labels())
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Bind query, execute and parse
+        query, params = select_user_by_platform.bind(
+            platform_id=platform_id,
+            user_platform_id=user_platform_id)
         try:
             try:
                 row = await connection.fetchrow(query, *params)
@@ -223,8 +400,7 @@ class UserByPlatformController(HTTPMethodView):
                 response_wrapper.error("User not found"),
                 status=404)
 
-        user = models.user.json_format(models.user.t.parse(row,
-                                                           prefix="users_"))
+        user = map_user_by_platform(row)
 
         # Return the user
         return response.json(response_wrapper.ok(user))
@@ -232,20 +408,17 @@ class UserByPlatformController(HTTPMethodView):
 
 class UserPlatformsController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, user_id, platform_id, connection):
         """Returns the user's platforms."""
 
         # Check, is user and platform exists
-        for name, model, id in [
-            ("User", models.user, user_id),
-            ("Platform", models.platform, platform_id)
+        for name, template, id in [
+            ("User", select_user, user_id),
+            ("Platform", select_platform, platform_id)
         ]:
             try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
+                query, params = template.bind(id=id)
 
                 try:
                     row = await connection.fetchrow(query, *params)
@@ -259,102 +432,61 @@ class UserPlatformsController(HTTPMethodView):
                     response_wrapper.error(f"{name} not found"),
                     status=404)
 
-        # Prepare query
-        query = (select([models.user_platform.t])
-            .select_from(models.user_platform.t)
-            .where(models.user_platform.t.c.user_id == user_id)
-            .where(models.user_platform.t.c.platform_id == platform_id))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+        # Bind query, execute and parse
+        query, params = list_user_platforms.bind(user_id=user_id,
+                                                 platform_id=platform_id)
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        user_platforms = [
-            models.user_platform.json_format(models.user_platform.t.parse(row))
-            for row in rows
-        ]
+        user_platforms = (encode_user_platform(row) for row in rows)
 
         # Return the list
-        return response.json(response_wrapper.ok(user_platforms))
+        return response.raw(response_wrapper.ok_list(user_platforms),
+                            content_type="application/json")
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def post(self, request, user_id, platform_id, connection):
         """Creates a new user's platform."""
 
         # User's platform form
         user_platform = request.json
 
-        # Check, is user and platform exists
-        for name, model, id in [
-            ("User", models.user, user_id),
-            ("Platform", models.platform, platform_id)
-        ]:
-            try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
+        # Save user's platform, if user and platform exist, the saved row
+        # is returned at once
+        query, params = insert_user_platform.bind(
+            user_id=user_id,
+            platform_id=platform_id,
+            user_platform_id=user_platform["user_platform_id"])
 
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
 
-                if not row:
-                    raise exceptions.NotFoundError
-            except exceptions.NotFoundError:
+        for name, exists in [("User", row["user_exists"]),
+                             ("Platform", row["platform_exists"])]:
+            if not exists:
                 return response.json(
                     response_wrapper.error(f"{name} not found"),
                     status=404)
 
-        # Create a transaction
-        # We need to 1) save user, 2) fetch user from a database
-        async with connection.transaction():
-            try:
-                query = (models.user_platform.t
-                    .insert()
-                    .values(
-                        user_id=user_id,
-                        platform_id=platform_id,
-                        user_platform_id=user_platform["user_platform_id"]
-                    )
-                )
-                query, params = asyncpgsa.compile_query(query)
-
-                id = await connection.fetchval(query, *params)
-
-                query = (select([models.user_platform.t])
-                    .select_from(models.user_platform.t)
-                    .where(models.user_platform.t.c.user_id == user_id)
-                    .where(models.user_platform.t.c.platform_id == platform_id)
-                    .where(models.user_platform.t.c.user_platform_id == user_platform["user_platform_id"]))
-                query, params = asyncpgsa.compile_query(query)
-
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
-
-                if not row:
-                    raise exceptions.NotFoundError
-
-                user_platform = models.user_platform.json_format(
-                    models.user_platform.t.parse(row))
-            except (PostgresError, exceptions.DatabaseError):
-                raise exceptions.NotCreatedError
+        user_platform = map_user_platform(row)
 
         return response.json(response_wrapper.ok(user_platform), status=201)
 
 
 class UserSavedEventsController(HTTPMethodView):
 
-    default_listing = listing.Listing(1, 100, 25)
+    default_listing = listing.Listing(1, 100, 25, keys=[
+        ("start_date", listing.parse_date),
+        ("end_date", listing.parse_date),
+        ("created_at", listing.parse_datetime),
+        ("id", listing.parse_uuid)])
     """Limits and default options for events listing."""
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def get(self, request, user_id, connection):
         """Returns a list of user's saved events."""
 
@@ -368,10 +500,7 @@ class UserSavedEventsController(HTTPMethodView):
 
         # Check, is user exists
         try:
-            query = (select([models.user.t])
-                .select_from(models.user.t)
-                .where(models.user.t.c.id == user_id))
-            query, params = asyncpgsa.compile_query(query)
+            query, params = select_user.bind(id=user_id)
 
             try:
                 row = await connection.fetchrow(query, *params)
@@ -385,163 +514,91 @@ class UserSavedEventsController(HTTPMethodView):
                 response_wrapper.error(f"User not found"),
                 status=404)
 
-        # Prepare query
-        query = (select([models.user_saved_event.t, models.event.t])
-            .select_from(models.user_saved_event.t.join(
-                models.event.t,
-                models.event.t.c.id == models.user_saved_event.t.c.event_id
-            ))
-            .where(models.user_saved_event.t.c.user_id == user_id)
-            .apply_labels())
-
-        # Adjust query according to listing options
-        if pivot is not None:
-            try:
-                query_pivot = query.where(models.event.t.c.id == pivot)
-                query_pivot, params = asyncpgsa.compile_query(query_pivot)
-
+        # Choose query according to listing options
+        if pivot is None:
+            query, params = list_saved_events.bind(user_id=user_id,
+                                                   limit=limit)
+        else:
+            # Pivot is specified by ID, its sort keys have to be queried
+            if not isinstance(pivot, dict):
                 try:
-                    row = await connection.fetchrow(query_pivot, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
+                    query_pivot, params = select_saved_event.bind(
+                        user_id=user_id, id=pivot)
 
-                if not row:
-                    raise exceptions.NotFoundError
+                    try:
+                        row = await connection.fetchrow(query_pivot, *params)
+                    except PostgresError:
+                        raise exceptions.NotFetchedError
 
-                pivot = models.event.t.parse(row, prefix="events_")
-            except exceptions.NotFoundError:
-                return response.json(
-                    response_wrapper.error("Pivot event not found"),
-                    status=400)
+                    if not row:
+                        raise exceptions.NotFoundError
+
+                    pivot = models.event.t.parse(row, prefix="events_")
+                except exceptions.NotFoundError:
+                    return response.json(
+                        response_wrapper.error("Pivot event not found"),
+                        status=400)
 
             if direction == listing.Direction.BEFORE:
-                query = (query
-                    .where(
-                        (models.event.t.c.start_date > pivot["start_date"])
-                        | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date < pivot["end_date"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at < pivot["created_at"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at == pivot["created_at"])
-                            & (models.event.t.c.id > pivot["id"])
-                        )
-                    ))
+                template = list_saved_events_before
             elif direction == listing.Direction.AFTER:
-                query = (query
-                    .where(
-                        (models.event.t.c.start_date < pivot["start_date"])
-                        | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date > pivot["end_date"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at > pivot["created_at"])
-                        ) | (
-                            (models.event.t.c.start_date == pivot["start_date"])
-                            & (models.event.t.c.end_date == pivot["end_date"])
-                            & (models.event.t.c.created_at == pivot["created_at"])
-                            & (models.event.t.c.id < pivot["id"])
-                        )
-                    ))
-
-        # Apply sorting and limit
-        if direction == listing.Direction.BEFORE:
-            query = (query
-                .order_by(models.event.t.c.start_date.asc())
-                .order_by(models.event.t.c.end_date.desc())
-                .order_by(models.event.t.c.created_at.desc())
-                .order_by(models.event.t.c.id.asc())
-                .limit(limit))
-        elif direction == listing.Direction.AFTER:
-            query = (query
-                .order_by(models.event.t.c.start_date.desc())
-                .order_by(models.event.t.c.end_date.asc())
-                .order_by(models.event.t.c.created_at.asc())
-                .order_by(models.event.t.c.id.desc())
-                .limit(limit))
-
-        # Compile query, execute and parse
-        query, params = asyncpgsa.compile_query(query)
+                template = list_saved_events_after
+
+            query, params = template.bind(user_id=user_id, limit=limit,
+                                          **pivot)
+
+        # Execute and parse
         try:
             rows = await connection.fetch(query, *params)
         except PostgresError:
             raise exceptions.NotFetchedError
 
-        events = [
-            models.event.json_format(models.event.t.parse(row, prefix="events_"))
-            for row in rows
-        ]
-
         if direction == listing.Direction.BEFORE:
-            events.reverse()
+            rows.reverse()
+
+        events = (encode_saved_event(row) for row in rows)
+
+        cursors = self.default_listing.cursors(rows, prefix="events_")
 
         # Return the list
-        return response.json(response_wrapper.ok(events))
+        return response.raw(response_wrapper.ok_list(events, cursors),
+                            content_type="application/json")
 
 
 class UserSavedEventController(HTTPMethodView):
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def put(self, request, user_id, event_id, connection):
         """Saves event for the user."""
 
-        # Check, is user and event exists
-        for name, model, id in [
-            ("User", models.user, user_id),
-            ("Event", models.event, event_id)
-        ]:
-            try:
-                query = (select([model.t])
-                    .select_from(model.t)
-                    .where(model.t.c.id == id))
-                query, params = asyncpgsa.compile_query(query)
+        # Save event for user, if user and event exist
+        query, params = insert_saved_event.bind(user_id=user_id,
+                                                event_id=event_id)
 
-                try:
-                    row = await connection.fetchrow(query, *params)
-                except PostgresError:
-                    raise exceptions.NotFetchedError
+        # Execute
+        try:
+            row = await connection.fetchrow(query, *params)
+        except PostgresError:
+            raise exceptions.NotCreatedError
 
-                if not row:
-                    raise exceptions.NotFoundError
-            except exceptions.NotFoundError:
+        for name, exists in [("User", row["user_exists"]),
+                             ("Event", row["event_exists"])]:
+            if not exists:
                 return response.json(
                     response_wrapper.error(f"{name} not found"),
                     status=404)
 
-        # If all is ok, save event for user
-        query = (models.user_saved_event.t
-            .insert()
-            .values(user_id=user_id,
-                    event_id=event_id))
-
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
-        try:
-            rows = await connection.execute(query, *params)
-        except PostgresError:
-            raise exceptions.NotCreatedError
-
         # Return the HTTP 204
         return response.text("", content_type="application/json", status=204)
 
-    @helpers.db_connections.provide_connection()
+    @helpers.db_connections.provide_connection(lazy=True)
     async def delete(self, request, user_id, event_id, connection):
         """Removes event from saved events of the user."""
 
-        query = (models.user_saved_event.t
-            .delete()
-            .where(models.user_saved_event.t.c.user_id == user_id)
-            .where(models.user_saved_event.t.c.event_id == event_id))
+        query, params = delete_saved_event.bind(user_id=user_id,
+                                                event_id=event_id)
 
-        # Compile query and execute
-        query, params = asyncpgsa.compile_query(query)
+        # Execute
         try:
             rows = await connection.execute(query, *params)
         except PostgresError:
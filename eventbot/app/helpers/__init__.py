@@ -2,4 +2,13 @@
 Event Bot Server
 """
 
+from . import auth
+from . import caches
+from . import conditional
 from . import db_connections
+from . import passwords
+from . import query_shapes
+from . import routes
+from . import slow_queries
+from . import streaming
+from . import timing
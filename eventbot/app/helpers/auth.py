@@ -0,0 +1,45 @@
+"""
+Event Bot Server
+"""
+
+from typing import Optional
+
+from eventbot.app import metrics
+from eventbot.app import state
+from eventbot.lib import jwt
+
+
+def get_claims_cache() -> jwt.ClaimsCache:
+    """Returns a verified JWT claims cache."""
+    return state.claims_cache
+
+
+def get_token(request) -> Optional[str]:
+    """Returns the bearer token of the request, if any."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+def authenticate(token: str) -> dict:
+    """Returns verified claims of the token, cached ones, if possible.
+
+    Claims are shared between requests, so they should not be modified.
+    Raises :class:`exceptions.JWTError`, if the token is not valid."""
+    claims_cache = get_claims_cache()
+    claims = claims_cache.get(token)
+
+    if claims is not None:
+        metrics.claims_cache_requests.labels("hit").inc()
+        return claims
+
+    metrics.claims_cache_requests.labels("miss").inc()
+    claims = jwt.decode(token)
+    claims_cache.set(token, claims)
+    return claims
+
+
+def get_claims(request) -> Optional[dict]:
+    """Returns verified claims of the request, if it is authenticated."""
+    return request.get("claims")
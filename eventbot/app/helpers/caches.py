@@ -0,0 +1,180 @@
+"""
+Event Bot Server
+"""
+
+import json
+import logging
+import uuid
+from typing import Hashable, Optional
+
+import sqlalchemy as sa
+from asyncpg.connection import Connection
+from asyncpg.exceptions import PostgresError
+from sqlalchemy.sql import ColumnElement, select
+
+from eventbot.app import models
+from eventbot.app import state
+from eventbot.config import cache as config
+from eventbot.lib import cache
+from eventbot.lib import exceptions
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+SESSIONS = "sessions"
+PERSONS = "persons"
+LOCATIONS = "locations"
+TAGS = "tags"
+"""Event sub-resources, which are cached or versioned."""
+
+
+# Precompiled queries
+
+select_event_version = Template("caches.select_event_version",
+    select([models.event.t.c.version])
+    .select_from(models.event.t)
+    .where(models.event.t.c.id == sa.bindparam("id")))
+
+
+def notification(entity: ColumnElement, event_id: ColumnElement,
+                 version: ColumnElement) -> ColumnElement:
+    """Returns a call, which notifies all workers, that cached entries of
+    the entity are outdated. PostgreSQL delivers the notification only
+    when the transaction commits, so it should be a part of the change.
+
+    Version is a content version of the event, if known."""
+    payload = sa.cast(sa.func.json_build_object(
+        sa.literal_column("'entity'"), entity,
+        sa.literal_column("'event_id'"), sa.cast(event_id, sa.Text),
+        sa.literal_column("'version'"), version
+    ), sa.Text)
+
+    return sa.func.pg_notify(
+        sa.literal_column(f"'{config.NOTIFICATION_CHANNEL}'"), payload)
+
+
+bumped_event = (models.event.t
+    .update()
+    .values(version=models.event.t.c.version + 1)
+    .where(models.event.t.c.id == sa.bindparam("id"))
+    .returning(models.event.t.c.id, models.event.t.c.version)
+    .cte("bumped"))
+
+bump_event_version_query = Template("caches.bump_event_version",
+    select([
+        bumped_event.c.version,
+        notification(sa.cast(sa.bindparam("entity"), sa.Text),
+                     bumped_event.c.id,
+                     bumped_event.c.version).label("notified")
+    ])
+    .select_from(bumped_event))
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_schedule_cache() -> cache.LRUCache:
+    """Returns a serialized event schedules cache."""
+    return state.schedule_cache
+
+
+def get_event_versions() -> cache.VersionsCache:
+    """Returns known content versions of events."""
+    return state.event_versions
+
+
+def is_listening() -> bool:
+    """Checks, whether cache invalidation messages from all workers are
+    received, otherwise new entries should not be cached."""
+    connection = state.cache_notifications_connection
+    return connection is not None and not connection.is_closed()
+
+
+def event_key(event_id: str) -> Hashable:
+    """Returns a cache key for the event ID.
+
+    Different textual forms of the same UUID should share the entry."""
+    try:
+        return uuid.UUID(event_id)
+    except ValueError:
+        return event_id
+
+
+def evict(entity: str, event_id: str, version: Optional[int]=None):
+    """Drops cached entries of the entity in the current worker.
+
+    Known event version is replaced with a newer one, or dropped, if
+    the new version is unknown."""
+    key = event_key(event_id)
+    versions = get_event_versions()
+
+    if version is None or not is_listening():
+        versions.discard(key)
+    else:
+        versions.update(key, version)
+
+    if entity == SESSIONS:
+        get_schedule_cache().invalidate(key)
+
+
+def evict_all():
+    """Drops all cached entries in the current worker."""
+    get_schedule_cache().invalidate_all()
+    get_event_versions().clear()
+
+
+async def get_event_version(event_id: str,
+                            connection: Connection) -> Optional[int]:
+    """Returns content version of the event, or None if the event does
+    not exist."""
+    key = event_key(event_id)
+    versions = get_event_versions()
+
+    version = versions.get(key)
+    if version is not None:
+        return version
+
+    query, params = select_event_version.bind(id=event_id)
+
+    try:
+        version = await connection.fetchval(query, *params)
+    except PostgresError:
+        raise exceptions.NotFetchedError
+
+    # Version could be bumped by a concurrent request in the meantime
+    if version is not None and is_listening():
+        versions.update(key, version)
+
+    return version
+
+
+async def bump_event_version(event_id: str, connection: Connection,
+                             entity: str=SESSIONS) -> Optional[int]:
+    """Increments content version of the event and returns the new one.
+
+    Should be called in the same transaction with the change of the
+    entity, the event row stays locked until the transaction ends. All
+    workers are notified, when the transaction commits."""
+    query, params = bump_event_version_query.bind(id=event_id, entity=entity)
+
+    try:
+        return await connection.fetchval(query, *params)
+    except PostgresError:
+        raise exceptions.NotUpdatedError
+
+
+def receive(payload: str):
+    """Evicts cached entries according to the published message."""
+    try:
+        message = json.loads(payload)
+        evict(message["entity"], message["event_id"], message["version"])
+    except (ValueError, KeyError):
+        logger.warning("Malformed cache invalidation message: %s", payload)
+
+
+def invalidate(entity: str, event_id: str, version: Optional[int]):
+    """Drops cached entries of the event entity in the current worker
+    at once, after the change is committed.
+
+    Other workers are notified by the change itself, see
+    :func:`notification`."""
+    evict(entity, event_id, version)
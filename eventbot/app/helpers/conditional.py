@@ -0,0 +1,47 @@
+"""
+Event Bot Server
+"""
+
+from sanic import response
+
+from eventbot.app.helpers import caches
+from eventbot.lib import etags
+from eventbot.lib import response_wrapper
+
+
+def event_etag(key="connection"):
+    """Conditional GET support for event sub-resources.
+
+    Answers with HTTP 304, if the `If-None-Match` header matches the
+    content version of the event, otherwise adds the `ETag` header to
+    a successful response. The version is queried with the connection
+    of the handler, which is provided by an outer
+    :func:`db_connections.provide_connection`, so the query is observed
+    with the queries of the handler. A lazy connection is acquired only
+    if the version is not known yet."""
+    def decorator(fn):
+        async def wrapper(self, request, event_id, *args, **kwargs):
+            version = caches.get_event_versions().get(
+                caches.event_key(event_id))
+
+            if version is None:
+                version = await caches.get_event_version(event_id,
+                                                         kwargs[key])
+
+            if version is None:
+                return response.json(
+                    response_wrapper.error("Event not found"),
+                    status=404)
+
+            etag = etags.format(version)
+            if etags.matches(request.headers.get("If-None-Match"), etag):
+                return response.raw(b"", status=304, headers={"ETag": etag})
+
+            resp = await fn(self, request, event_id, *args, **kwargs)
+            if resp.status == 200:
+                resp.headers["ETag"] = etag
+
+            return resp
+
+        return wrapper
+    return decorator
@@ -2,10 +2,21 @@
 Event Bot Server
 """
 
+import collections
+import time
+
 import asyncpg
+import asyncpg.pool
 import sqlalchemy as sa
 
+from eventbot.app import metrics
 from eventbot.app import state
+from eventbot.app.helpers import query_shapes
+from eventbot.app.helpers import routes
+from eventbot.app.helpers import slow_queries
+from eventbot.app.helpers import timing
+from eventbot.lib.lazy_connection import LazyConnection
+from eventbot.lib.sqlalchemy import templates
 
 
 def get_pool():
@@ -24,30 +35,113 @@ def parse(table: sa.Table, record: asyncpg.Record, prefix: str="") -> dict:
     return parsed
 
 
-def get_connection():
+async def get_connection() -> asyncpg.Connection:
     """Returns a database connection.
 
-    Don't forget to close (return) the acquired connection."""
-    return await (get_pool().acquire())
+    Don't forget to close (return) the acquired connection. Time, spent
+    waiting for the connection, is observed."""
+    started_at = time.monotonic()
+    connection = await (get_pool().acquire())
+    metrics.pool_acquire_wait.observe(time.monotonic() - started_at)
+    return connection
 
 
-def close_connection(connection: asyncpg.Connection):
+async def close_connection(connection: asyncpg.Connection):
     """Closes an acquired connection."""
     await (get_pool().release(connection))
 
 
-def provide_connection(key="connection", force_replace=False):
+class acquire:
+    """Context manager, which gets a connection and closes it, like
+    `Pool.acquire` does, but observes the wait time."""
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        self.connection = await get_connection()
+        return self.connection
+
+    async def __aexit__(self, *exc_info):
+        await close_connection(self.connection)
+
+
+def observe_pool(pool: asyncpg.pool.Pool):
+    """Sets pool size gauges to read the pool on collection."""
+    metrics.pool_size.set_function(pool.get_size)
+    metrics.pool_idle.set_function(pool.get_idle_size)
+
+
+def get_statement(method: str, args: tuple) -> str:
+    """Returns the query template name of a connection method call, or
+    the method name for other statements."""
+    if args and isinstance(args[0], str):
+        return templates.names.get(args[0], method)
+    return method
+
+
+def observe_query(method: str, args: tuple, elapsed: float):
+    """Observes latency of a statement, by the query template name, and
+    logs it, if it is slow. Returns the statement name."""
+    statement = get_statement(method, args)
+    metrics.statement_latency.labels(statement).observe(elapsed)
+    slow_queries.observe(statement, method, args, elapsed)
+    return statement
+
+
+def provide_connection(key="connection", force_replace=False, lazy=False):
     """An easy way to get the instance of database connection.
 
     Pass `force_replace=True` if you want to replace already provided
-    connection with a new one."""
+    connection with a new one.
+
+    Pass `lazy=True` if you want the connection to be acquired only for
+    queries and transactions, see :class:`LazyConnection`, so it is not
+    held while the request is parsed and the response is built.
+
+    Connection hold time and number of queries are observed by the route
+    of the request, latency of every query is observed too, and added to
+    the database time of the request. If enabled, statements are counted
+    by shapes, so repeated statements are detected, see
+    :mod:`query_shapes`."""
     def decorator(fn):
         async def wrapper(*args, **kwargs):
-            if force_replace or key not in kwargs:
-                async with get_pool().acquire() as conn:
-                    kwargs[key] = conn
-                    return await fn(*args, **kwargs)
-            return await fn(*args, **kwargs)
+            if not force_replace and key in kwargs:
+                return await fn(*args, **kwargs)
+
+            request = routes.find_request(args)
+            route = routes.get_route(request)
+            request_timing = timing.get_timing(request)
+            shapes = (collections.Counter() if query_shapes.is_enabled()
+                      else None)
+            read_only = (request is None
+                         or request.method in query_shapes.READ_METHODS)
+
+            def observe(method: str, args: tuple, elapsed: float):
+                statement = observe_query(method, args, elapsed)
+                if request_timing is not None:
+                    request_timing.db += elapsed
+                if shapes is not None:
+                    shape = query_shapes.get_shape(statement, args)
+                    shapes[statement, shape] += 1
+
+            conn = kwargs[key] = LazyConnection(
+                get_connection, close_connection, observe)
+
+            try:
+                # Not lazy connection is just held until the end
+                if not lazy:
+                    await conn.acquire()
+
+                result = await fn(*args, **kwargs)
+
+                if shapes is not None:
+                    query_shapes.check(route, shapes, read_only)
+
+                return result
+            finally:
+                await conn.close()
+                metrics.connection_hold_time.labels(route).observe(
+                    conn.hold_time)
+                metrics.queries_per_request.labels(route).observe(
+                    conn.queries)
 
         return wrapper
     return decorator
@@ -0,0 +1,51 @@
+"""
+Event Bot Server
+"""
+
+import asyncio
+import concurrent.futures
+
+from eventbot.app import metrics
+from eventbot.app import state
+from eventbot.lib import password
+
+
+def get_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Returns a process pool for password hashing."""
+    return state.password_executor
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    """Returns a semaphore, which bounds concurrent password hashing."""
+    return state.password_semaphore
+
+
+async def run(fn, *args):
+    """Runs the password function in the process pool, so the event loop
+    is not blocked. Calls over the concurrency limit wait in a queue."""
+    semaphore = get_semaphore()
+
+    metrics.password_queue_depth.inc()
+    try:
+        await semaphore.acquire()
+    finally:
+        metrics.password_queue_depth.dec()
+
+    metrics.password_running.inc()
+    try:
+        return await asyncio.get_event_loop().run_in_executor(
+            get_executor(), fn, *args)
+    finally:
+        metrics.password_running.dec()
+        semaphore.release()
+
+
+async def hash(raw: str) -> str:
+    """Hash the password with a randomly generated salt, off the event
+    loop."""
+    return await run(password.hash, raw)
+
+
+async def verify(raw: str, crypted: str) -> bool:
+    """Match a raw and crypted password, off the event loop."""
+    return await run(password.verify, raw, crypted)
@@ -0,0 +1,72 @@
+"""
+Event Bot Server
+"""
+
+import logging
+import re
+import typing
+
+from eventbot.app import metrics
+from eventbot.config import db as config
+from eventbot.lib import exceptions
+
+
+logger = logging.getLogger(__name__)
+
+WARN = "warn"
+FAIL = "fail"
+"""Modes of the repeated queries detection."""
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+"""Methods of requests, which fail on repeated statements in "fail" mode.
+Changes of other requests could be already committed at the check, so
+their repeated statements are only warned about."""
+
+# Methods, which run a query, passed as the first argument, including
+# cursors of streamed lists
+QUERY_METHODS = {"fetch", "fetchrow", "fetchval", "execute", "executemany",
+                 "cursor"}
+
+# Literals and parameters of ad hoc statements, replaced in their shapes
+literals = re.compile(r"'(?:[^']|'')*'|\$\d+|\b\d+(?:\.\d+)?\b")
+spaces = re.compile(r"\s+")
+
+
+def is_enabled() -> bool:
+    """Checks, whether queries of requests are counted by shapes."""
+    return config.REPEATED_QUERIES_MODE in (WARN, FAIL)
+
+
+def get_shape(statement: str, args: tuple) -> str:
+    """Returns the shape of a statement: the query template name, if it
+    is known, the normalized query, or the target table of a copy."""
+    if statement in QUERY_METHODS and args:
+        query = literals.sub("?", str(args[0]))
+        return spaces.sub(" ", query).strip().lower()
+    if statement == "copy_records_to_table" and args:
+        return f"{statement} {args[0]}"
+    return statement
+
+
+def check(route: str, shapes: typing.Counter[typing.Tuple[str, str]],
+          read_only: bool=True):
+    """Observes, how many times every statement has run in a request, and
+    warns or fails, if a shape has run more times, than allowed.
+
+    Shapes are counted by the statement name and the shape. Requests,
+    which are not read only, are never failed, see :data:`READ_METHODS`.
+    """
+    repeated = []
+
+    for (statement, shape), count in shapes.items():
+        metrics.statement_repeats.labels(route, statement).observe(count)
+
+        if count > config.REPEATED_QUERIES_THRESHOLD:
+            logger.warning("Statement %s has run %d times in %s",
+                           shape, count, route)
+            repeated.append(f"{shape} x{count}")
+
+    if (repeated and config.REPEATED_QUERIES_MODE == FAIL
+            and read_only):
+        raise exceptions.RepeatedQueriesError(
+            f"Repeated statements in {route}: " + ", ".join(repeated))
@@ -0,0 +1,34 @@
+"""
+Event Bot Server
+"""
+
+from typing import Optional
+
+from sanic.exceptions import SanicException
+from sanic.request import Request
+
+
+def find_request(args) -> Optional[Request]:
+    """Returns the request among handler arguments, if any."""
+    for arg in args:
+        if isinstance(arg, Request):
+            return arg
+    return None
+
+
+def get_route(request: Optional[Request]) -> str:
+    """Returns the route pattern of the request, like
+    `/events/<event_id>`, so metrics are not split by IDs.
+
+    Falls back to the request path, if no route matches."""
+    if request is None:
+        return ""
+
+    route = getattr(request, "uri_template", None)
+    if route is not None:
+        return route
+
+    try:
+        return request.app.router.get(request)[-1]
+    except SanicException:
+        return request.path
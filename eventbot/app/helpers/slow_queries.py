@@ -0,0 +1,98 @@
+"""
+Event Bot Server
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import typing
+
+import pendulum
+from asyncpg.exceptions import PostgresError
+
+from eventbot.app import state
+from eventbot.config import db as config
+
+
+logger = logging.getLogger(__name__)
+
+# Methods, which run a single statement with parameters, so the statement
+# could be explained
+EXPLAINABLE = {"fetch", "fetchrow", "fetchval", "execute"}
+
+# Statements, which change data, also in CTEs, are not run again, as they
+# would conflict with their own changes, e.g. by generated primary keys
+modifying = re.compile(r"\b(?:INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+# Whether a statement is being explained, so only one connection is
+# taken for plans at a time
+explaining = False
+
+
+class Rollback(Exception):
+    """Raised to roll back an explained statement."""
+
+
+def get_plans() -> typing.Deque[dict]:
+    """Returns the last plans of slow statements."""
+    return state.slow_query_plans
+
+
+def observe(statement: str, method: str, args: tuple, elapsed: float):
+    """Logs the statement, if it is slower, than the threshold, and
+    explains it on a sampled basis."""
+    if config.SLOW_QUERY_THRESHOLD is None:
+        return
+    if elapsed < config.SLOW_QUERY_THRESHOLD:
+        return
+
+    query, params = (args[0], args[1:]) if args else ("", ())
+    logger.warning("Slow statement %s took %.3fs: %s %r",
+                   statement, elapsed, query, params)
+
+    if (method in EXPLAINABLE
+            and not explaining
+            and random.random() < config.SLOW_QUERY_EXPLAIN_RATE):
+        asyncio.ensure_future(explain(statement, query, params, elapsed))
+
+
+async def explain(statement: str, query: str, params: tuple,
+                  elapsed: float):
+    """Explains the statement on a separate connection and keeps the
+    plan. Reading statements are run again and rolled back, so their
+    plans are analyzed, plans of changing ones are estimated only."""
+    global explaining
+    explaining = True
+
+    analyze = not modifying.search(query)
+    options = ("ANALYZE, BUFFERS, FORMAT JSON" if analyze
+               else "FORMAT JSON")
+
+    try:
+        async with state.pool.acquire() as connection:
+            try:
+                async with connection.transaction():
+                    plan = await connection.fetchval(
+                        f"EXPLAIN ({options}) " + query, *params)
+                    raise Rollback
+            except Rollback:
+                pass
+    except PostgresError as error:
+        logger.warning("Failed to explain slow statement %s: %s",
+                       statement, error)
+        return
+    finally:
+        explaining = False
+
+    get_plans().append({
+        "statement": statement,
+        "query": query,
+        "params": [None if param is None else str(param)
+                   for param in params],
+        "elapsed": elapsed,
+        "analyzed": analyze,
+        "explained_at": pendulum.now().isoformat(),
+        "plan": json.loads(plan)
+    })
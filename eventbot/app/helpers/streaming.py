@@ -0,0 +1,69 @@
+"""
+Event Bot Server
+"""
+
+import time
+from typing import Any, Callable, List
+
+import asyncpg
+from sanic import response
+
+from eventbot.app.helpers import db_connections
+from eventbot.config import db as config
+
+
+def is_requested(request) -> bool:
+    """Checks, whether the client has opted in for a streamed list."""
+    return request.raw_args.get("stream", "").lower() in ("1", "true")
+
+
+def list_response(request, query: str, params: List[Any],
+                  encode: Callable[[asyncpg.Record], str]):
+    """Returns a chunked response with the list of encoded records.
+
+    Records are read from a server-side cursor in batches, and every
+    batch is written as a separate chunk, so memory usage does not
+    depend on the list size. The response is started before the query
+    runs, so all checks, which could end with an error status, should
+    be made in advance.
+
+    The response is written after the handler has returned, so the
+    streaming function is provided with its own connection, which is
+    observed by the route of the request, and is held until the last
+    chunk is written. Fetches of the cursor are observed as a single
+    query."""
+    async def write_batch(resp, items: List[str], first: bool):
+        await resp.write(("" if first else ",") + ",".join(items))
+
+    @db_connections.provide_connection(lazy=True)
+    async def stream(request, resp, connection):
+        # Cursors exist only within a transaction
+        async with connection.transaction():
+            await resp.write('{"status":"ok","data":[')
+
+            started_at = time.monotonic()
+            cursor = await connection.cursor(query, *params)
+            elapsed = time.monotonic() - started_at
+            first = True
+
+            try:
+                while True:
+                    started_at = time.monotonic()
+                    records = await cursor.fetch(config.STREAM_BATCH_SIZE)
+                    elapsed += time.monotonic() - started_at
+
+                    if not records:
+                        break
+
+                    await write_batch(resp, [encode(record)
+                                             for record in records], first)
+                    first = False
+            finally:
+                connection.observe("cursor", (query, *params), elapsed)
+
+            await resp.write("]}")
+
+    async def streaming_fn(resp):
+        await stream(request, resp)
+
+    return response.stream(streaming_fn, content_type="application/json")
@@ -0,0 +1,64 @@
+"""
+Event Bot Server
+"""
+
+import functools
+import time
+from typing import Optional
+
+from sanic.request import Request
+
+
+class Timing:
+    """Time, spent on a request, by phases.
+
+    Handler time is tracked by :func:`timed` handlers, database time is
+    tracked by connections of :func:`db_connections.provide_connection`.
+    """
+
+    __slots__ = ("started_at", "route", "handler", "db")
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.route = None
+        self.handler = 0.0
+        self.db = 0.0
+
+    def phases(self):
+        """Returns database, serialization and framework time.
+
+        Serialization is the handler time, which is not spent on queries,
+        framework is the rest of the request time, including middleware.
+        """
+        total = time.monotonic() - self.started_at
+        return [
+            ("db", self.db),
+            ("serialization", max(self.handler - self.db, 0.0)),
+            ("framework", max(total - self.handler, 0.0))
+        ]
+
+
+def get_timing(request: Optional[Request]) -> Optional[Timing]:
+    """Returns timing of the request, if it is tracked."""
+    if request is None:
+        return None
+    return request.get("timing")
+
+
+def timed(handler, route: str):
+    """Wraps the view, so its handler time and route pattern are tracked
+    in the timing of the request."""
+    @functools.wraps(handler)
+    async def wrapper(request, *args, **kwargs):
+        timing = get_timing(request)
+        if timing is None:
+            return await handler(request, *args, **kwargs)
+
+        timing.route = route
+        started_at = time.monotonic()
+        try:
+            return await handler(request, *args, **kwargs)
+        finally:
+            timing.handler += time.monotonic() - started_at
+
+    return wrapper
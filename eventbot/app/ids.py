@@ -0,0 +1,156 @@
+"""
+Event Bot Server
+"""
+
+import datetime
+import multiprocessing
+import uuid
+from typing import Any, Dict, List, Optional
+
+import pendulum
+import sqlalchemy as sa
+
+from eventbot.app import state
+from eventbot.config import app as app_config
+from eventbot.config import db as config
+from eventbot.lib import snowflake
+from eventbot.lib.sqlalchemy.types import DateTime, GUID
+
+
+UUID4 = "uuid4"
+SNOWFLAKE = "snowflake"
+"""Strategies of new primary keys."""
+
+MIN_ID = uuid.UUID(int=0)
+MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+"""Bounds of all IDs."""
+
+MIN_TIME = datetime.datetime.min.replace(tzinfo=pendulum.UTC)
+MAX_TIME = datetime.datetime.max.replace(tzinfo=pendulum.UTC)
+"""Bounds of all creation times."""
+
+# Time-ordered IDs could be issued slightly before or after the creation
+# time, so their bounds are wider, than the creation time range, by ms
+ID_TIME_SLACK = 1000
+
+
+def worker_index() -> int:
+    """Returns the index of the server worker process, from 0.
+
+    Workers are started as `Process-1`, `Process-2` and so on, a single
+    worker runs in the main process."""
+    name = multiprocessing.current_process().name
+    _, _, number = name.rpartition("-")
+    return int(number) - 1 if number.isdigit() else 0
+
+
+def machine_id() -> int:
+    """Returns Snowflake Machine ID of the worker."""
+    return (app_config.MACHINE_ID * app_config.WORKERS
+            + worker_index() % app_config.WORKERS)
+
+
+def new_id() -> uuid.UUID:
+    """Returns a new primary key by the configured strategy, without
+    waiting for the clock."""
+    if config.ID_STRATEGY == SNOWFLAKE:
+        return snowflake.uuid_of_snowflake(state.id_allocator.allocate()[0])
+    return uuid.uuid4()
+
+
+async def reserve_ids(count: int) -> List[uuid.UUID]:
+    """Returns a block of new primary keys by the configured strategy,
+    for bulk inserts."""
+    if config.ID_STRATEGY == SNOWFLAKE:
+        return [snowflake.uuid_of_snowflake(id)
+                for id in await state.id_allocator.reserve(count)]
+    return [uuid.uuid4() for _ in range(count)]
+
+
+def first_id_for_time(time: datetime.datetime) -> uuid.UUID:
+    """Returns the first time-ordered ID of the time. Times, which are
+    out of the range of Snowflake timestamps, are clamped to the bounds
+    of all IDs."""
+    timestamp = int(time.timestamp() * 1000)
+
+    if timestamp < snowflake.EPOCH:
+        return MIN_ID
+    if timestamp >= snowflake.EPOCH + (1 << snowflake.TIMESTAMP_BITS):
+        return MAX_ID
+
+    return uuid.UUID(int=snowflake.first_snowflake_for_timestamp(timestamp)
+                     << 64)
+
+
+def shift_time(time: datetime.datetime,
+               delta: datetime.timedelta) -> datetime.datetime:
+    """Returns the time, shifted by the delta, but clamped to the bounds
+    of all creation times."""
+    try:
+        return time + delta
+    except OverflowError:
+        return MAX_TIME if delta > datetime.timedelta(0) else MIN_TIME
+
+
+def created_between(table: sa.Table) -> sa.sql.ClauseElement:
+    """Returns a predicate of things, created within the time range. IDs
+    are compared too, so time-ordered IDs are scanned by their range.
+
+    Range parameters are returned by :func:`created_range`."""
+    return sa.and_(
+        table.c.id >= sa.bindparam("min_id", type_=GUID),
+        table.c.id < sa.bindparam("max_id", type_=GUID),
+        table.c.created_at >= sa.bindparam("created_after", type_=DateTime),
+        table.c.created_at < sa.bindparam("created_before", type_=DateTime))
+
+
+def created_range(created_after: Optional[datetime.datetime]=None,
+                  created_before: Optional[datetime.datetime]=None
+                  ) -> Dict[str, Any]:
+    """Returns parameters of the :func:`created_between` predicate.
+
+    IDs are bounded only if all of them are time-ordered, otherwise all
+    IDs are in the range, and things are filtered by the creation time
+    only."""
+    min_id, max_id = MIN_ID, MAX_ID
+
+    if config.ID_STRATEGY == SNOWFLAKE and config.TIME_ORDERED_IDS:
+        slack = datetime.timedelta(milliseconds=ID_TIME_SLACK)
+
+        if created_after is not None:
+            min_id = first_id_for_time(shift_time(created_after, -slack))
+        if created_before is not None:
+            max_id = first_id_for_time(shift_time(created_before, slack))
+
+    return {
+        "min_id": min_id,
+        "max_id": max_id,
+        "created_after": created_after or MIN_TIME,
+        "created_before": created_before or MAX_TIME
+    }
+
+
+def created_range_from_request(request) -> Optional[Dict[str, Any]]:
+    """Returns parameters of the :func:`created_between` predicate from
+    `created_after` and `created_before` arguments of the request, if any.
+
+    Raises ValueError, if arguments are malformed."""
+    created_after = request.raw_args.get("created_after", None)
+    created_before = request.raw_args.get("created_before", None)
+
+    if created_after is None and created_before is None:
+        return None
+
+    def parse(value: Optional[str]) -> Optional[datetime.datetime]:
+        if not value:
+            return None
+
+        time = pendulum.parse(value)
+        if not isinstance(time, datetime.datetime):
+            raise ValueError("Malformed creation time")
+        return time
+
+    try:
+        return created_range(parse(created_after), parse(created_before))
+    except (TypeError, OverflowError):
+        raise ValueError("Malformed creation time")
@@ -2,5 +2,10 @@
 Event Bot Server
 """
 
+from . import cache
+from . import cache_notifications
 from . import controllers_registration
 from . import db_connection
+from . import ids
+from . import passwords
+from . import schema
@@ -0,0 +1,19 @@
+"""
+Event Bot Server
+"""
+
+from eventbot.app import state
+from eventbot.config import cache as config
+from eventbot.config import jose as jose_config
+from eventbot.lib import cache
+from eventbot.lib import jwt
+
+
+async def before_start_listener(app, loop):
+    """Creates in-process caches."""
+    state.schedule_cache = cache.LRUCache(config.SCHEDULE_MAX_SIZE,
+                                          config.SCHEDULE_MAX_VERSIONS)
+    state.event_versions = cache.VersionsCache(
+        config.EVENT_VERSIONS_MAX_ENTRIES)
+    state.cache_notifications_connection = None
+    state.claims_cache = jwt.ClaimsCache(jose_config.CLAIMS_CACHE_MAX_ENTRIES)
@@ -0,0 +1,90 @@
+"""
+Event Bot Server
+"""
+
+import asyncio
+import logging
+
+import asyncpg
+
+from eventbot.app import helpers
+from eventbot.app import state
+from eventbot.config import cache as cache_config
+from eventbot.config import db as db_config
+
+
+logger = logging.getLogger(__name__)
+
+
+def notification_listener(connection, pid, channel, payload):
+    """Handles a cache invalidation message from any worker."""
+    helpers.caches.receive(payload)
+
+
+async def connect(loop) -> asyncpg.Connection:
+    """Opens a dedicated connection, subscribed to the cache
+    invalidation channel."""
+    connection = await asyncpg.connect(
+        host=db_config.HOST,
+        port=db_config.PORT,
+        user=db_config.USER,
+        password=db_config.PASSWORD,
+        database=db_config.DATABASE,
+        loop=loop)
+
+    try:
+        await connection.add_listener(cache_config.NOTIFICATION_CHANNEL,
+                                      notification_listener)
+    except BaseException:
+        await connection.close()
+        raise
+
+    return connection
+
+
+async def watch(loop):
+    """Keeps the notifications connection alive.
+
+    While the connection is lost, messages could be missed, so all
+    cached entries are dropped and new ones are not cached until it is
+    restored. Any connection error is retried."""
+    connection = None
+
+    try:
+        while True:
+            if connection is None or connection.is_closed():
+                state.cache_notifications_connection = None
+                helpers.caches.evict_all()
+
+                try:
+                    connection = await connect(loop)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.warning("Cache notifications connection failed",
+                                   exc_info=True)
+                    connection = None
+
+                state.cache_notifications_connection = connection
+
+            await asyncio.sleep(cache_config.NOTIFICATION_CHECK_INTERVAL)
+    finally:
+        state.cache_notifications_connection = None
+
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+
+async def after_start_listener(app, loop):
+    """Starts listening for cache invalidation messages."""
+    state.cache_notifications = loop.create_task(watch(loop))
+
+
+async def before_stop_listener(app, loop):
+    """Stops listening for cache invalidation messages."""
+    state.cache_notifications.cancel()
+
+    try:
+        await state.cache_notifications
+    except asyncio.CancelledError:
+        pass
@@ -3,6 +3,7 @@ Event Bot Server
 """
 
 from eventbot.app import controllers
+from eventbot.app import helpers
 
 
 CONTROLLERS_MAP = [
@@ -22,14 +23,23 @@ CONTROLLERS_MAP = [
     ("/events/<event_id>/persons", controllers.PersonsController),
     ("/events/<event_id>/locations", controllers.LocationsController),
     ("/events/<event_id>/tags", controllers.TagsController),
+    ("/events/<event_id>/import", controllers.EventImportController),
+
+    ("/events/<event_id>/sessions/<session_id>/persons", controllers.SessionPersonsController),
+    ("/events/<event_id>/sessions/<session_id>/locations", controllers.SessionLocationsController),
+    ("/events/<event_id>/sessions/<session_id>/tags", controllers.SessionTagsController),
 
     ("/events/<event_id>/sessions/<session_id>/persons/<person_id>", controllers.SessionPersonController),
     ("/events/<event_id>/sessions/<session_id>/locations/<location_id>", controllers.SessionLocationController),
-    ("/events/<event_id>/sessions/<session_id>/tags/<tag_id>", controllers.SessionTagController)
+    ("/events/<event_id>/sessions/<session_id>/tags/<tag_id>", controllers.SessionTagController),
+
+    ("/debug/slow_queries", controllers.SlowQueriesController)
 ]
 
 
 async def before_start_listener(app, loop):
-    """Server listener for controllers registration."""
+    """Server listener for controllers registration.
+
+    Handler time of every controller is tracked by its route."""
     for route, controller in CONTROLLERS_MAP:
-        app.add_route(controller.as_view(), route)
+        app.add_route(helpers.timing.timed(controller.as_view(), route), route)
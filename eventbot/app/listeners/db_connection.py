@@ -2,14 +2,18 @@
 Event Bot Server
 """
 
+import collections
+
 import asyncpg
 
+from eventbot.app import helpers
 from eventbot.app import state
 from eventbot.config import db as config
 
 
 async def before_start_listener(app, loop):
-    """Creates a connection pool."""
+    """Creates a connection pool, observes its size and keeps plans of
+    slow statements."""
     state.pool = await asyncpg.create_pool(
         host=config.HOST,
         port=config.PORT,
@@ -22,6 +26,10 @@ async def before_start_listener(app, loop):
         max_inactive_connection_lifetime=config.MAX_INACTIVE_CONNECTION_LIFETIME,
         loop=loop)
 
+    helpers.db_connections.observe_pool(state.pool)
+
+    state.slow_query_plans = collections.deque(maxlen=config.SLOW_QUERY_PLANS)
+
 
 async def after_stop_listener(app, loop):
     """Closes the connection pool."""
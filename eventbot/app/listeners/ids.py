@@ -0,0 +1,12 @@
+"""
+Event Bot Server
+"""
+
+from eventbot.app import ids
+from eventbot.app import state
+from eventbot.lib import snowflake
+
+
+async def before_start_listener(app, loop):
+    """Creates a Snowflake IDs allocator of the worker."""
+    state.id_allocator = snowflake.Allocator(ids.machine_id())
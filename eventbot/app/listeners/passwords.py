@@ -0,0 +1,21 @@
+"""
+Event Bot Server
+"""
+
+import asyncio
+import concurrent.futures
+
+from eventbot.app import state
+from eventbot.config import passlib as config
+
+
+async def before_start_listener(app, loop):
+    """Creates a process pool for password hashing of the worker."""
+    state.password_executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=config.MAX_WORKERS)
+    state.password_semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY)
+
+
+async def after_stop_listener(app, loop):
+    """Shuts the password hashing process pool down."""
+    state.password_executor.shutdown(wait=False)
@@ -0,0 +1,28 @@
+"""
+Event Bot Server
+"""
+
+import logging
+
+from eventbot.app import helpers
+from eventbot.app import models
+from eventbot.config import db as config
+from eventbot.lib.sqlalchemy import migrations
+
+
+logger = logging.getLogger(__name__)
+
+
+async def before_start_listener(app, loop):
+    """Upgrades the database schema, if enabled, and warns about indexes,
+    which queries depend on, but the database does not have."""
+    async with helpers.db_connections.acquire() as connection:
+        if config.MIGRATE:
+            for statement in await migrations.upgrade(connection,
+                                                      models.metadata):
+                logger.info("Schema upgraded: %s", statement.strip())
+
+        for name in await migrations.missing_indexes(connection,
+                                                     models.metadata):
+            logger.warning("Database index %s is missing, run the server "
+                           "with MIGRATE=1 to create it", name)
@@ -0,0 +1,85 @@
+"""
+Event Bot Server
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Connection pool
+
+pool_size = Gauge(
+    "eventbot_db_pool_size",
+    "Number of open connections in the pool")
+"""Pool size, set to read the pool on collection."""
+
+pool_idle = Gauge(
+    "eventbot_db_pool_idle",
+    "Number of idle connections in the pool")
+"""Idle connections, set to read the pool on collection."""
+
+pool_acquire_wait = Histogram(
+    "eventbot_db_pool_acquire_wait_seconds",
+    "Time, spent waiting for a connection from the pool")
+"""Acquire wait time."""
+
+
+# Connections and queries of requests
+
+connection_hold_time = Histogram(
+    "eventbot_db_connection_hold_seconds",
+    "Time, a database connection is held by a request handler",
+    ["route"])
+"""Connection hold time, by the route pattern."""
+
+queries_per_request = Histogram(
+    "eventbot_db_queries_per_request",
+    "Number of database queries, run by a request handler",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, float("inf")))
+"""Queries per request, by the route pattern."""
+
+statement_latency = Histogram(
+    "eventbot_db_statement_seconds",
+    "Database statement latency",
+    ["statement"])
+"""Statement latency, by the query template name, or by the connection
+method name for other statements."""
+
+statement_repeats = Histogram(
+    "eventbot_db_statement_repeats_per_request",
+    "Number of times a statement has run in a request, counted only if "
+    "the repeated queries detection is enabled",
+    ["route", "statement"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, float("inf")))
+"""Statement repeats, by the route pattern and the statement."""
+
+
+# Requests
+
+request_phase_time = Histogram(
+    "eventbot_request_phase_seconds",
+    "Time of a request, spent on database, serialization and framework",
+    ["route", "phase"])
+"""Request time, by the route pattern and the phase."""
+
+
+# Authentication
+
+claims_cache_requests = Counter(
+    "eventbot_jwt_claims_cache_requests_total",
+    "Lookups of verified JWT claims in the cache",
+    ["result"])
+"""Claims cache lookups, by the result: hit or miss."""
+
+
+# Password hashing
+
+password_queue_depth = Gauge(
+    "eventbot_password_queue_depth",
+    "Number of password hashing calls, waiting for the process pool")
+"""Password hashing calls in the queue."""
+
+password_running = Gauge(
+    "eventbot_password_running",
+    "Number of password hashing calls, running in the process pool")
+"""Password hashing calls in the process pool."""
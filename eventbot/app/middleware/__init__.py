@@ -1,3 +1,6 @@
 """
 Event Bot Server
 """
+
+from . import authentication
+from . import timing
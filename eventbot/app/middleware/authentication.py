@@ -0,0 +1,37 @@
+"""
+Event Bot Server
+"""
+
+from sanic import response
+
+from eventbot.app.helpers import auth
+from eventbot.config import jose as config
+from eventbot.lib import exceptions
+from eventbot.lib import response_wrapper
+
+
+async def request_middleware(request):
+    """Verifies the bearer token of the request, if any, and keeps its
+    claims in the request.
+
+    Requests without a token or with an invalid one are rejected only if
+    authentication is required for the path, otherwise an invalid token
+    is ignored, as if there was none."""
+    required = (config.AUTHENTICATION_REQUIRED
+                and request.path not in config.PUBLIC_PATHS)
+    token = auth.get_token(request)
+
+    if token is None:
+        if required:
+            return response.json(
+                response_wrapper.error("Authentication required"),
+                status=401)
+        return
+
+    try:
+        request["claims"] = auth.authenticate(token)
+    except exceptions.JWTError:
+        if required:
+            return response.json(
+                response_wrapper.error("Invalid token"),
+                status=401)
@@ -0,0 +1,32 @@
+"""
+Event Bot Server
+"""
+
+from eventbot.app import metrics
+from eventbot.app.helpers import timing
+from eventbot.config import app as config
+
+
+async def request_middleware(request):
+    """Starts tracking time of the request."""
+    request["timing"] = timing.Timing()
+
+
+async def response_middleware(request, response):
+    """Observes time of the request phases by its route pattern, and adds
+    the `Server-Timing` header, if enabled.
+
+    Requests, which have not been routed to a controller, are skipped."""
+    request_timing = timing.get_timing(request)
+    if request_timing is None or request_timing.route is None:
+        return
+
+    phases = request_timing.phases()
+
+    for phase, elapsed in phases:
+        metrics.request_phase_time.labels(
+            request_timing.route, phase).observe(elapsed)
+
+    if config.SERVER_TIMING:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{phase};dur={elapsed * 1000:.3f}" for phase, elapsed in phases)
@@ -5,7 +5,14 @@ Event Bot Server
 import sqlalchemy as sa
 
 
-metadata = sa.MetaData()
+metadata = sa.MetaData(naming_convention={
+    # PostgreSQL default names, so constraints of existing databases are
+    # recognized by migrations
+    "pk": "%(table_name)s_pkey",
+    "uq": "%(table_name)s_%(column_0_name)s_key",
+    "fk": "%(table_name)s_%(column_0_name)s_fkey",
+    "ix": "ix_%(table_name)s_%(column_0_name)s"
+})
 """SQLAlchemy Metadata instance."""
 
 
@@ -3,13 +3,14 @@ Event Bot Server
 """
 
 import datetime
-import uuid
 
 import pendulum
 import sqlalchemy as sa
 
 from . import metadata
-from eventbot.lib.sqlalchemy.base import Table
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
+from eventbot.lib.sqlalchemy.base import Table, isoformat
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
 
@@ -17,7 +18,7 @@ t = table = Table(
     "events",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
 
     sa.Column("name", sa.String(1024), nullable=False),
     sa.Column("description", sa.Text(), nullable=False),
@@ -25,22 +26,40 @@ t = table = Table(
     sa.Column("start_date", sa.Date, nullable=False),
     sa.Column("end_date", sa.Date, nullable=False),
 
-    sa.Column("created_at", DateTime, default=pendulum.now, nullable=False)
+    sa.Column("created_at", DateTime, default=pendulum.now, nullable=False),
+
+    # content version of the event sub-resources, bumped on every change
+    sa.Column("version", sa.BigInteger, default=1, server_default="1",
+              nullable=False)
+)
+
+listing_order = (
+    t.c.start_date.desc(),
+    t.c.end_date.asc(),
+    t.c.created_at.asc(),
+    t.c.id.desc()
 )
+"""Sort keys of the events listing."""
+
+sa.Index("ix_events_listing", *listing_order)
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+
+    # name and description as is
+    ("name", None),
+    ("description", None),
+
+    # convert datetimes to iso8601 format
+    ("start_date", isoformat),
+    ("end_date", isoformat),
+    ("created_at", isoformat)
+]
+"""JSON-ready representation of the event object."""
 
 
 def json_format(event):
     """Returns JSON-ready representation of the event object."""
-    return {
-        # convert uuid to str
-        "id": str(event["id"]),
-
-        # name and description as is
-        "name": event["name"],
-        "description": event["description"],
-
-        # convert datetimes to iso8601 format
-        "start_date": event["start_date"].isoformat(),
-        "end_date": event["end_date"].isoformat(),
-        "created_at": event["created_at"].isoformat()
-    }
+    return base.json_format(json_fields, event)
@@ -3,12 +3,13 @@ Event Bot Server
 """
 
 import datetime
-import uuid
 
 import pendulum
 import sqlalchemy as sa
 
 from . import metadata
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
 from eventbot.lib.sqlalchemy.base import Table
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
@@ -17,21 +18,29 @@ t = table = Table(
     "locations",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
-    sa.Column("event_id", GUID, nullable=False),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
+    sa.Column("event_id", GUID,
+              sa.ForeignKey("events.id", ondelete="CASCADE"), nullable=False),
 
     sa.Column("name", sa.String(512), nullable=False),
 )
 
+# event locations listing
+sa.Index("ix_locations_event", t.c.event_id, t.c.name.asc(), t.c.id.desc())
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+    # convert uuid to str, w/o event object
+    ("event_id", str),
+
+    # name as is
+    ("name", None)
+]
+"""JSON-ready representation of the location object."""
+
 
 def json_format(location):
     """Returns JSON-ready representation of the location object."""
-    return {
-        # convert uuid to str
-        "id": str(location["id"]),
-        # convert uuid to str, w/o event object
-        "event_id": str(location["event_id"]),
-
-        # name as is
-        "name": location["name"]
-    }
+    return base.json_format(json_fields, location)
@@ -2,11 +2,12 @@
 Event Bot Server
 """
 
-import uuid
 
 import sqlalchemy as sa
 
 from . import metadata
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
 from eventbot.lib.sqlalchemy.base import Table
 from eventbot.lib.sqlalchemy.types import GUID
 
@@ -15,21 +16,33 @@ t = table = Table(
     "platforms",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
     sa.Column("slug", sa.String(64), unique=True, nullable=False),
 
     sa.Column("name", sa.String(128), nullable=False)
 )
 
+listing_order = (
+    t.c.slug.asc(),
+    t.c.id.desc()
+)
+"""Sort keys of the platforms listing."""
+
+sa.Index("ix_platforms_listing", *listing_order)
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+    # slug as is
+    ("slug", None),
+
+    # name as is
+    ("name", None)
+]
+"""JSON-ready representation of the platform object."""
+
 
 def json_format(platform):
     """Returns JSON-ready representation of the platform object."""
-    return {
-        # convert uuid to str
-        "id": str(platform["id"]),
-        # slug as is
-        "slug": platform["slug"],
-
-        # name as is
-        "name": platform["name"]
-    }
+    return base.json_format(json_fields, platform)
@@ -3,13 +3,14 @@ Event Bot Server
 """
 
 import datetime
-import uuid
 
 import pendulum
 import sqlalchemy as sa
 
 from . import metadata
-from eventbot.lib.sqlalchemy.base import Table
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
+from eventbot.lib.sqlalchemy.base import Table, isoformat, str_list
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
 
@@ -17,8 +18,9 @@ t = table = Table(
     "sessions",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
-    sa.Column("event_id", GUID, nullable=False),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
+    sa.Column("event_id", GUID,
+              sa.ForeignKey("events.id", ondelete="CASCADE"), nullable=False),
 
     sa.Column("title", sa.String(1024), nullable=False),
     sa.Column("description", sa.Text(), nullable=False),
@@ -29,21 +31,37 @@ t = table = Table(
     sa.Column("created_at", DateTime, default=pendulum.now, nullable=False)
 )
 
+# event schedule
+sa.Index("ix_sessions_schedule", t.c.event_id, t.c.start_time.asc(),
+         t.c.end_time.asc(), t.c.created_at.asc(), t.c.id.desc())
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+    # convert uuid to str, w/o/ event object
+    ("event_id", str),
+
+    # title and description as is
+    ("title", None),
+    ("description", None),
+
+    # convert datetimes to iso8601 format
+    ("start_time", isoformat),
+    ("end_time", isoformat),
+    ("created_at", isoformat)
+]
+"""JSON-ready representation of the session object."""
+
+schedule_json_fields = json_fields + [
+    # convert aggregated uuids of linked objects to str
+    ("persons", str_list),
+    ("locations", str_list),
+    ("tags", str_list)
+]
+"""JSON-ready representation of the session object in a schedule."""
+
 
 def json_format(session):
     """Returns JSON-ready representation of the session object."""
-    return {
-        # convert uuid to str
-        "id": str(session["id"]),
-        # convert uuid to str, w/o/ event object
-        "event_id": str(session["event_id"]),
-
-        # title and description as is
-        "title": session["title"],
-        "description": session["description"],
-
-        # convert datetimes to iso8601 format
-        "start_time": session["start_time"].isoformat(),
-        "end_time": session["end_time"].isoformat(),
-        "created_at": session["created_at"].isoformat()
-    }
+    return base.json_format(json_fields, session)
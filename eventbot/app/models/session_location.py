@@ -16,6 +16,13 @@ t = table = Table(
     "session_locations",
     metadata,
 
-    sa.Column("session_id", GUID, nullable=False),
-    sa.Column("location_id", GUID, nullable=False)
+    sa.Column("session_id", GUID,
+              sa.ForeignKey("sessions.id", ondelete="CASCADE"),
+              nullable=False),
+    sa.Column("location_id", GUID,
+              sa.ForeignKey("locations.id", ondelete="CASCADE"),
+              nullable=False),
+
+    # also serves schedule aggregation by session
+    sa.PrimaryKeyConstraint("session_id", "location_id")
 )
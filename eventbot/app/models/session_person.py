@@ -16,6 +16,13 @@ t = table = Table(
     "session_persons",
     metadata,
 
-    sa.Column("session_id", GUID, nullable=False),
-    sa.Column("person_id", GUID, nullable=False)
+    sa.Column("session_id", GUID,
+              sa.ForeignKey("sessions.id", ondelete="CASCADE"),
+              nullable=False),
+    sa.Column("person_id", GUID,
+              sa.ForeignKey("persons.id", ondelete="CASCADE"),
+              nullable=False),
+
+    # also serves schedule aggregation by session
+    sa.PrimaryKeyConstraint("session_id", "person_id")
 )
@@ -16,6 +16,13 @@ t = table = Table(
     "session_tags",
     metadata,
 
-    sa.Column("session_id", GUID, nullable=False),
-    sa.Column("tag_id", GUID, nullable=False)
+    sa.Column("session_id", GUID,
+              sa.ForeignKey("sessions.id", ondelete="CASCADE"),
+              nullable=False),
+    sa.Column("tag_id", GUID,
+              sa.ForeignKey("tags.id", ondelete="CASCADE"),
+              nullable=False),
+
+    # also serves schedule aggregation by session
+    sa.PrimaryKeyConstraint("session_id", "tag_id")
 )
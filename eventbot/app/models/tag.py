@@ -3,12 +3,13 @@ Event Bot Server
 """
 
 import datetime
-import uuid
 
 import pendulum
 import sqlalchemy as sa
 
 from . import metadata
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
 from eventbot.lib.sqlalchemy.base import Table
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
@@ -17,24 +18,32 @@ t = table = Table(
     "tags",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
-    sa.Column("event_id", GUID, nullable=False),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
+    sa.Column("event_id", GUID,
+              sa.ForeignKey("events.id", ondelete="CASCADE"), nullable=False),
 
     sa.Column("name", sa.String(1024), nullable=False),
     sa.Column("color", sa.String(8)),
 )
 
+# event tags listing
+sa.Index("ix_tags_event", t.c.event_id, t.c.name.asc(), t.c.id.desc())
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+    # convert uuid to str, w/o event object
+    ("event_id", str),
+
+    # name as is
+    ("name", None),
+    # color as is, can be null
+    ("color", None)
+]
+"""JSON-ready representation of the tag object."""
+
 
 def json_format(tag):
     """Returns JSON-ready representation of the tag object."""
-    return {
-        # convert uuid to str
-        "id": str(tag["id"]),
-        # convert uuid to str, w/o event object
-        "event_id": str(tag["event_id"]),
-
-        # name as is
-        "name": tag["name"],
-        # color as is, can be null
-        "color": tag["color"]
-    }
+    return base.json_format(json_fields, tag)
@@ -3,13 +3,14 @@ Event Bot Server
 """
 
 import datetime
-import uuid
 
 import pendulum
 import sqlalchemy as sa
 
 from . import metadata
-from eventbot.lib.sqlalchemy.base import Table
+from eventbot.app import ids
+from eventbot.lib.sqlalchemy import base
+from eventbot.lib.sqlalchemy.base import Table, isoformat
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
 
@@ -17,18 +18,30 @@ t = table = Table(
     "users",
     metadata,
 
-    sa.Column("id", GUID, primary_key=True, default=uuid.uuid4),
+    sa.Column("id", GUID, primary_key=True, default=ids.new_id),
 
     sa.Column("created_at", DateTime, default=pendulum.now, nullable=False)
 )
 
+listing_order = (
+    t.c.created_at.desc(),
+    t.c.id.desc()
+)
+"""Sort keys of the users listing."""
+
+sa.Index("ix_users_listing", *listing_order)
+
+
+json_fields = [
+    # convert uuid to str
+    ("id", str),
+
+    # convert datetimes to iso8601 format
+    ("created_at", isoformat)
+]
+"""JSON-ready representation of the user object."""
+
 
 def json_format(user):
     """Returns JSON-ready representation of the user object."""
-    return {
-        # convert uuid to str
-        "id": str(user["id"]),
-
-        # convert datetimes to iso8601 format
-        "created_at": user["created_at"].isoformat()
-    }
+    return base.json_format(json_fields, user)
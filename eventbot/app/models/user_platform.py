@@ -8,7 +8,8 @@ import pendulum
 import sqlalchemy as sa
 
 from . import metadata
-from eventbot.lib.sqlalchemy.base import Table
+from eventbot.lib.sqlalchemy import base
+from eventbot.lib.sqlalchemy.base import Table, isoformat
 from eventbot.lib.sqlalchemy.types import DateTime, GUID
 
 
@@ -16,25 +17,37 @@ t = table = Table(
     "user_platforms",
     metadata,
 
-    sa.Column("user_id", GUID, nullable=False),
-    sa.Column("platform_id", GUID, nullable=False),
+    sa.Column("user_id", GUID,
+              sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("platform_id", GUID,
+              sa.ForeignKey("platforms.id", ondelete="CASCADE"),
+              nullable=False),
 
     sa.Column("user_platform_id", sa.String(1024)),
-    sa.Column("created_at", DateTime, default=pendulum.now, nullable=False)
+    sa.Column("created_at", DateTime, default=pendulum.now, nullable=False),
+
+    # user lookup by the platform account
+    sa.Index("ix_user_platforms_account", "platform_id", "user_platform_id"),
+    # user's platform accounts
+    sa.Index("ix_user_platforms_user", "user_id", "platform_id")
 )
 
 
+json_fields = [
+    # convert uuid to str
+    ("user_id", str),
+    ("platform_id", str),
+
+    # unknown id as is
+    ("user_platform_id", None),
+
+    # convert datetimes to iso8601 format
+    ("created_at", isoformat)
+]
+"""JSON-ready representation of the user's platform object."""
+
+
 def json_format(user_platform):
     """Returns JSON-ready representation of the user's platform
     object."""
-    return {
-        # convert uuid to str
-        "user_id": str(user_platform["user_id"]),
-        "platform_id": str(user_platform["platform_id"]),
-
-        # unknown id as is
-        "user_platform_id": user_platform["user_platform_id"],
-
-        # convert datetimes to iso8601 format
-        "created_at": user_platform["created_at"].isoformat()
-    }
+    return base.json_format(json_fields, user_platform)
@@ -16,8 +16,13 @@ t = table = Table(
     "user_saved_events",
     metadata,
 
-    sa.Column("user_id", GUID, nullable=False),
-    sa.Column("event_id", GUID, nullable=False),
+    sa.Column("user_id", GUID,
+              sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("event_id", GUID,
+              sa.ForeignKey("events.id", ondelete="CASCADE"), nullable=False),
 
-    sa.Column("saved_at", DateTime, default=pendulum.now, nullable=False)
+    sa.Column("saved_at", DateTime, default=pendulum.now, nullable=False),
+
+    # also serves saved events listing by user
+    sa.PrimaryKeyConstraint("user_id", "event_id")
 )
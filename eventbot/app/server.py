@@ -12,31 +12,44 @@ from eventbot import config
 
 before_start_listeners = [
     listeners.controllers_registration.before_start_listener,
-    listeners.db_connection.before_start_listener
+    listeners.ids.before_start_listener,
+    listeners.db_connection.before_start_listener,
+    listeners.schema.before_start_listener,
+    listeners.cache.before_start_listener,
+    listeners.passwords.before_start_listener
 ]
 """List of listeners, that will be iterated, and each listener will
 be invoked before server start."""
 
-after_start_listeners = []
+after_start_listeners = [
+    listeners.cache_notifications.after_start_listener
+]
 """List of listeners, that will be iterated, and each listener will
 be invoked after server start."""
 
-before_stop_listeners = []
+before_stop_listeners = [
+    listeners.cache_notifications.before_stop_listener
+]
 """List of listeners, that will be iterated, and each listener will
 be invoked before server stop."""
 
 after_stop_listeners = [
-    listeners.db_connection.after_stop_listener
+    listeners.db_connection.after_stop_listener,
+    listeners.passwords.after_stop_listener
 ]
 """List of listeners, that will be iterated, and each listener will
 be invoked after server stop."""
 
 request_middleware = [
+    middleware.timing.request_middleware,
+    middleware.authentication.request_middleware
 ]
 """Functions which will be executed before each request to the
 server."""
 
-response_middleware = []
+response_middleware = [
+    middleware.timing.response_middleware
+]
 """Functions which will be executed after each request to the
 server."""
 
@@ -3,6 +3,7 @@ Event Bot Server
 """
 
 import asyncio
+import concurrent.futures
 import typing
 
 import asyncpg
@@ -10,6 +11,8 @@ import asyncpg.pool
 from sanic import Sanic
 from sanic_prometheus import monitor
 
+from eventbot.lib import cache
+from eventbot.lib import jwt
 from eventbot.lib import snowflake
 
 
@@ -29,3 +32,39 @@ monitor(app).expose_endpoint()
 
 pool: asyncpg.pool.Pool
 """PostgreSQL connection pool."""
+
+slow_query_plans: typing.Deque[dict]
+"""Plans of the last explained slow statements."""
+
+
+# Password hashing off the event loop
+
+password_executor: concurrent.futures.ProcessPoolExecutor
+"""Process pool for password hashing."""
+
+password_semaphore: asyncio.Semaphore
+"""Bounds concurrent password hashing calls."""
+
+
+# Snowflake IDs
+
+id_allocator: snowflake.Allocator
+"""Snowflake IDs allocator of the worker."""
+
+
+# In-process caches
+
+schedule_cache: cache.LRUCache
+"""Serialized event schedules, by event ID."""
+
+event_versions: cache.VersionsCache
+"""Known content versions of events, by event ID."""
+
+claims_cache: jwt.ClaimsCache
+"""Verified JWT claims, by token digest."""
+
+cache_notifications_connection: typing.Optional[asyncpg.Connection]
+"""Connection, subscribed to cache invalidation messages, if any."""
+
+cache_notifications: asyncio.Task
+"""Task, listening for cache invalidation messages from all workers."""
@@ -3,6 +3,7 @@ Event Bot Server
 """
 
 from . import app
+from . import cache
 from . import db
 from . import jose
 from . import passlib
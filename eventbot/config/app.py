@@ -7,3 +7,10 @@ PORT = 8080
 
 DEBUG = True
 WORKERS = 4
+
+# Machine of the server, Snowflake Machine IDs of its workers are
+# MACHINE_ID * WORKERS + worker index, up to 1023
+MACHINE_ID = 0
+
+# Add the Server-Timing header with time of request phases to responses
+SERVER_TIMING = False
@@ -0,0 +1,19 @@
+"""
+Event Bot Server
+"""
+
+# 64 MiB per worker
+SCHEDULE_MAX_SIZE = 64 * 1024 * 1024
+
+# Versions of invalidated schedules, the least recently used are forgotten
+SCHEDULE_MAX_VERSIONS = 65536
+
+# Known content versions of events, used for conditional requests
+EVENT_VERSIONS_MAX_ENTRIES = 65536
+
+# PostgreSQL channel for cache invalidation messages between workers
+NOTIFICATION_CHANNEL = "eventbot_cache"
+
+# Seconds between checks of the notifications connection; caches are
+# dropped when it is lost, because messages could be missed
+NOTIFICATION_CHECK_INTERVAL = 5.0
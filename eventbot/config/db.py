@@ -13,3 +13,37 @@ POOL_MAX_SIZE = 10
 
 MAX_QUERIES = 50000
 MAX_INACTIVE_CONNECTION_LIFETIME = 300.0
+
+# Upgrade the database schema on start, otherwise only check it
+MIGRATE = False
+
+# Statements, slower than the threshold in seconds, are logged; None
+# disables the slow query log
+SLOW_QUERY_THRESHOLD = 0.5
+
+# Share of slow statements, which are explained on a separate connection,
+# and the number of the last plans kept for the debug endpoint
+SLOW_QUERY_EXPLAIN_RATE = 0.0
+SLOW_QUERY_PLANS = 20
+
+# Serve the kept plans on /debug/slow_queries; they could disclose query
+# parameters, so the endpoint is off unless enabled explicitly
+SLOW_QUERY_ENDPOINT = False
+
+# Counting of statements in a request by their shapes, for development:
+# None, "warn" or "fail", when a shape runs more times, than the threshold;
+# changing requests are only warned about, as they could be committed
+REPEATED_QUERIES_MODE = None
+REPEATED_QUERIES_THRESHOLD = 5
+
+# Strategy of new primary keys: "uuid4" for random UUIDs, "snowflake" for
+# time-ordered UUIDs, built from Snowflake IDs of workers
+ID_STRATEGY = "uuid4"
+
+# All rows have time-ordered IDs, e.g. the database was created with the
+# "snowflake" strategy, so creation time ranges are scanned by ID ranges.
+# Rows with random IDs would be missed by such scans
+TIME_ORDERED_IDS = False
+
+# Rows, fetched from a server-side cursor at once for streamed responses
+STREAM_BATCH_SIZE = 500
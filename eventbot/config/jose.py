@@ -9,3 +9,10 @@ ISSUER = "Event Bot Server"
 
 # 7 days
 EXPIRATION_DELTA = 60 * 60 * 24 * 7
+
+# Verified tokens, which claims are cached per worker
+CLAIMS_CACHE_MAX_ENTRIES = 4096
+
+# Reject requests without a token, except for public paths
+AUTHENTICATION_REQUIRED = False
+PUBLIC_PATHS = ["/metrics"]
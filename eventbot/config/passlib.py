@@ -6,3 +6,8 @@ SCHEMES = [
     "argon2",
     "bcrypt"
 ]
+
+# Processes, which hash passwords, per worker, and hashing calls, which
+# run at once, other calls wait in a queue
+MAX_WORKERS = 2
+MAX_CONCURRENCY = 4
@@ -0,0 +1,144 @@
+"""
+Event Bot Server
+"""
+
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class LRUCache:
+    """Least recently used cache of byte strings.
+
+    The cache is bounded by the total size of stored values, the least
+    recently used entries are evicted first. Each key has a version,
+    which is bumped on invalidation, so a value computed before the
+    invalidation will not be stored.
+
+    Versions are bounded by their own number, the least recently used
+    are forgotten first. Versions only grow: a forgotten one is folded
+    into the version of all untracked keys.
+    """
+
+    def __init__(self, max_size: int, max_versions: int):
+        self.max_size = max_size
+        self.max_versions = max_versions
+        self.size = 0
+
+        self._entries = OrderedDict()
+        self._versions = OrderedDict()
+        self._floor = 0
+        self._counter = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, key: Hashable) -> int:
+        """Returns current version of the key."""
+        try:
+            self._versions.move_to_end(key)
+        except KeyError:
+            return self._floor
+        return self._versions[key]
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Returns cached value and marks it as recently used."""
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+        return self._entries[key]
+
+    def set(self, key: Hashable, value: bytes, version: int) -> bool:
+        """Stores the value, if the key was not invalidated since the
+        specified version had been obtained.
+
+        Values larger than the cache itself are never stored.
+        """
+        if version != self.version(key) or len(value) > self.max_size:
+            return False
+
+        self._discard(key)
+
+        self._entries[key] = value
+        self.size += len(value)
+
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+        return True
+
+    def invalidate(self, key: Hashable):
+        """Removes the cached value and bumps the key version."""
+        self._discard(key)
+
+        self._counter += 1
+        self._versions[key] = self._counter
+        self._versions.move_to_end(key)
+
+        while len(self._versions) > self.max_versions:
+            _, forgotten = self._versions.popitem(last=False)
+            self._floor = max(self._floor, forgotten)
+
+    def invalidate_all(self):
+        """Removes all cached values and bumps versions of all keys."""
+        self._entries.clear()
+        self._versions.clear()
+        self.size = 0
+
+        self._counter += 1
+        self._floor = self._counter
+
+    def _discard(self, key: Hashable):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self.size -= len(value)
+
+
+class VersionsCache:
+    """Least recently used cache of known versions, e.g. of database
+    rows, bounded by the number of entries.
+
+    Versions of a key only grow, an older one is never stored.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Returns known version and marks it as recently used."""
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+        return self._entries[key]
+
+    def update(self, key: Hashable, version: int):
+        """Stores the version, if it is newer than the known one."""
+        if version <= self._entries.get(key, version - 1):
+            return
+
+        self._entries[key] = version
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        """Forgets the version of the key."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Forgets all versions."""
+        self._entries.clear()
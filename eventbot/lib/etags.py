@@ -0,0 +1,30 @@
+"""
+Event Bot Server
+"""
+
+from typing import Optional
+
+
+def format(version: int) -> str:
+    """Builds a strong entity tag for the content version."""
+    return f'"{version}"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks the `If-None-Match` header value against the entity tag.
+
+    Weak comparison is used, as required for the header."""
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+
+    return False
@@ -25,6 +25,10 @@ class DatabaseError(EventBotError):
     pass
 
 
+class RepeatedQueriesError(DatabaseError):
+    pass
+
+
 class NotFetchedError(DatabaseError):
     pass
 
@@ -0,0 +1,26 @@
+"""
+Event Bot Server
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+
+
+encode_string = encode_basestring_ascii
+"""Encodes a str into a quoted JSON string, non-ASCII are escaped."""
+
+
+def encode_value(value) -> str:
+    """Encodes a JSON-ready value into JSON text."""
+    if isinstance(value, str):
+        return encode_string(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(map(encode_value, value)) + "]"
+
+    return json.dumps(value, separators=(",", ":"))
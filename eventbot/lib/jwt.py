@@ -2,6 +2,11 @@
 Event Bot Server
 """
 
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
 import pendulum
 from jose import jwt
 from jose.exceptions import JWTError
@@ -47,8 +52,63 @@ def decode(token: str, verify: bool=True) -> dict:
     """Decode the JWT."""
     if verify:
         try:
-            return jwt.decode(token, config.SECRET, config.ALGORITHM)
+            return jwt.decode(token, config.SECRET, config.ALGORITHM,
+                              issuer=config.ISSUER)
         except JWTError:
             raise exceptions.JWTError
     else:
         return jwt.get_unverified_claims(token)
+
+
+class ClaimsCache:
+    """Least recently used cache of verified JWT claims.
+
+    Tokens are keyed by their digest. Cached claims are returned only
+    while the token is valid by its `nbf` and `exp` claims, the issuer
+    and the signature have been verified before the claims were cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        """Returns the digest of the token."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Returns cached claims of the token, if it is still valid, and
+        marks them as recently used. Expired claims are evicted."""
+        key = self.key(token)
+
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+
+        claims = self._entries[key]
+        now = time.time()
+
+        if "exp" in claims and claims["exp"] <= now:
+            del self._entries[key]
+            return None
+        if "nbf" in claims and claims["nbf"] > now:
+            return None
+
+        return claims
+
+    def set(self, token: str, claims: dict):
+        """Stores verified claims of the token."""
+        key = self.key(token)
+
+        self._entries[key] = claims
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
@@ -0,0 +1,130 @@
+"""
+Event Bot Server
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import asyncpg
+
+
+class LazyConnection:
+    """Connection, which is acquired from the pool only for a query.
+
+    The connection is acquired on the first query and released as soon
+    as its result is fetched. Within a transaction, the connection is
+    held until the transaction ends. Total time, the connection has been
+    held, is tracked in :attr:`hold_time`, the number of queries is
+    tracked in :attr:`queries`.
+
+    Other attributes of the connection are available only while it is
+    held, e.g. after :meth:`acquire`.
+    """
+
+    def __init__(self,
+                 acquire: Callable[[], Awaitable[asyncpg.Connection]],
+                 release: Callable[[asyncpg.Connection], Awaitable[Any]],
+                 observe_query: Optional[Callable[[str, tuple, float],
+                                                  None]]=None):
+        self.hold_time = 0.0
+        self.queries = 0
+
+        self._acquire = acquire
+        self._release = release
+        # called with a method name, its arguments and latency
+        self._observe_query = observe_query
+
+        self._connection = None
+        self._acquired_at = 0.0
+        # number of running queries and transactions
+        self._holds = 0
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or self._connection is None:
+            raise AttributeError(f"{name} is not available, while the "
+                                 f"connection is not held")
+        return getattr(self._connection, name)
+
+    async def acquire(self) -> asyncpg.Connection:
+        """Returns the connection, acquiring it, if it is not held."""
+        if self._connection is None:
+            self._connection = await self._acquire()
+            self._acquired_at = time.monotonic()
+
+        self._holds += 1
+        return self._connection
+
+    async def release(self):
+        """Releases the connection, if it is not needed anymore."""
+        self._holds -= 1
+
+        if self._holds == 0 and self._connection is not None:
+            connection, self._connection = self._connection, None
+            self.hold_time += time.monotonic() - self._acquired_at
+            await self._release(connection)
+
+    async def close(self):
+        """Releases the connection, even if it is still held."""
+        self._holds = 1
+        await self.release()
+
+    def observe(self, name: str, args: tuple, elapsed: float):
+        """Counts and observes a query, which has been run by other means,
+        than the query methods, e.g. with a cursor."""
+        self.queries += 1
+        if self._observe_query is not None:
+            self._observe_query(name, args, elapsed)
+
+    def _query(name: str):
+        async def query(self, *args, **kwargs):
+            connection = await self.acquire()
+            started_at = time.monotonic()
+            try:
+                return await getattr(connection, name)(*args, **kwargs)
+            finally:
+                self.observe(name, args, time.monotonic() - started_at)
+                await self.release()
+
+        query.__name__ = name
+        query.__doc__ = f"Acquires a connection and runs its {name}."
+        return query
+
+    fetch = _query("fetch")
+    fetchrow = _query("fetchrow")
+    fetchval = _query("fetchval")
+    execute = _query("execute")
+    executemany = _query("executemany")
+    copy_records_to_table = _query("copy_records_to_table")
+
+    del _query
+
+    def transaction(self, **kwargs) -> "LazyTransaction":
+        """Returns a transaction, which holds the connection."""
+        return LazyTransaction(self, **kwargs)
+
+
+class LazyTransaction:
+    """Transaction of the lazy connection."""
+
+    def __init__(self, lazy_connection: LazyConnection, **kwargs):
+        self.lazy_connection = lazy_connection
+        self.kwargs = kwargs
+        self.transaction = None
+
+    async def __aenter__(self):
+        connection = await self.lazy_connection.acquire()
+
+        try:
+            self.transaction = connection.transaction(**self.kwargs)
+            await self.transaction.__aenter__()
+        except BaseException:
+            await self.lazy_connection.release()
+            raise
+
+        return self.transaction
+
+    async def __aexit__(self, *exc_info):
+        try:
+            return await self.transaction.__aexit__(*exc_info)
+        finally:
+            await self.lazy_connection.release()
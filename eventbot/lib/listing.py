@@ -2,8 +2,21 @@
 Event Bot Server
 """
 
+import base64
 import enum
-from typing import Optional, Tuple, Union
+import hashlib
+import hmac
+import json
+import operator
+import uuid
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import pendulum
+import sqlalchemy as sa
+from sqlalchemy.sql import ClauseElement, Select, operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from eventbot.config import jose as config
 
 
 class Direction(enum.IntEnum):
@@ -12,14 +25,128 @@ class Direction(enum.IntEnum):
     AFTER = 1
 
 
+def parse_date(value: str):
+    """Parses a date of the cursor."""
+    return pendulum.parse(value).date()
+
+
+def parse_datetime(value: str):
+    """Parses a datetime of the cursor."""
+    return pendulum.parse(value)
+
+
+def parse_uuid(value: str):
+    """Parses an UUID of the cursor."""
+    return uuid.UUID(value)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class Keyset:
+    """Keyset pagination of a query, ordered by the sort keys.
+
+    Sort keys are specified as ordering clauses, e.g. ``column.desc()``.
+    Pivot values are bound by the column keys. Consecutive keys of the
+    same order are compared as a single row value, e.g.
+    ``(created_at, id) < ($1, $2)``, mixed orders are joined with a
+    leading inclusive bound, so the first sort key is always usable for
+    an index range scan.
+    """
+
+    def __init__(self, *order: ClauseElement):
+        self.order = order
+        self.keys = []
+
+        # runs of columns of the same order, with their bound values
+        self.runs = []
+
+        for clause in order:
+            if (isinstance(clause, UnaryExpression) and
+                    clause.modifier in (operators.asc_op, operators.desc_op)):
+                column = clause.element
+                descending = clause.modifier is operators.desc_op
+            else:
+                column, descending = clause, False
+
+            value = sa.bindparam(column.key, type_=column.type)
+            self.keys.append(column.key)
+
+            if self.runs and self.runs[-1][2] == descending:
+                self.runs[-1][0].append(column)
+                self.runs[-1][1].append(value)
+            else:
+                self.runs.append(([column], [value], descending))
+
+    @staticmethod
+    def _row(elements: Sequence[ClauseElement]) -> ClauseElement:
+        if len(elements) == 1:
+            return elements[0]
+        return sa.tuple_(*elements)
+
+    def order_by(self, direction: Direction=Direction.AFTER
+                 ) -> Sequence[ClauseElement]:
+        """Returns ordering clauses of a page, going in the direction."""
+        if direction == Direction.BEFORE:
+            return [
+                column.asc() if descending else column.desc()
+                for columns, _, descending in self.runs
+                for column in columns
+            ]
+        return self.order
+
+    def where(self, direction: Direction=Direction.AFTER) -> ClauseElement:
+        """Returns a predicate of things, following the pivot thing in
+        the direction."""
+        predicate = None
+
+        for columns, values, descending in reversed(self.runs):
+            left, right = self._row(columns), self._row(values)
+
+            if descending == (direction == Direction.BEFORE):
+                strict, inclusive = operator.gt, operator.ge
+            else:
+                strict, inclusive = operator.lt, operator.le
+
+            if predicate is None:
+                predicate = strict(left, right)
+            else:
+                predicate = sa.and_(inclusive(left, right),
+                                    sa.or_(strict(left, right), predicate))
+
+        return predicate
+
+    def page(self, query: Select, direction: Optional[Direction]=None
+             ) -> Select:
+        """Returns the query of a page, following the pivot thing in the
+        direction, or starting the list, if no direction is specified."""
+        if direction is None:
+            return query.order_by(*self.order_by())
+
+        return query.where(self.where(direction)) \
+            .order_by(*self.order_by(direction))
+
+
 class Listing:
     """Listing class.
     Methods for working with listings queries.
+
+    Listing can issue and accept opaque cursors, which contain values of
+    the sort keys of the pivot thing, so there is no need to query the
+    pivot thing. Cursors are signed with the JWT secret. Each sort key
+    is specified with a function, parsing its value back from str.
     """
 
-    def __init__(self, min_limit: int, max_limit: int, default_limit: int):
+    def __init__(self, min_limit: int, max_limit: int, default_limit: int,
+                 keys: Sequence[Tuple[str, Callable[[str], Any]]]=()):
         self.min_limit = min_limit
         self.max_limit = max_limit
+        self.keys = keys
 
         if self.validate_limit(default_limit) != default_limit:
             raise ValueError("Your default limit value does not comply with "
@@ -40,23 +167,74 @@ class Listing:
 
         return max(self.min_limit, min(self.max_limit, limit))
 
-    @staticmethod
-    def validate_id(id: Union[int, str]) -> Optional[int]:
-        """Returns validated ID.
+    def _sign(self, payload: str) -> str:
+        message = ",".join(key for key, _ in self.keys) + "." + payload
+        digest = hmac.new(config.SECRET.encode(), message.encode(),
+                          hashlib.sha256).digest()
+        return _b64encode(digest[:16])
+
+    def encode_cursor(self, record, prefix: str="") -> str:
+        """Returns a cursor, pointing to the record."""
+        values = []
+        for key, _ in self.keys:
+            value = record[prefix + key]
+            values.append(value.isoformat() if hasattr(value, "isoformat")
+                          else str(value))
+
+        payload = _b64encode(json.dumps(values).encode())
+        return payload + "." + self._sign(payload)
+
+    def decode_cursor(self, cursor: str) -> Dict[str, Any]:
+        """Returns values of the sort keys from the cursor."""
+        payload, _, signature = cursor.partition(".")
+
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            raise ValueError("Cursor signature mismatch")
+
+        try:
+            values = json.loads(_b64decode(payload).decode())
+        except (TypeError, UnicodeDecodeError, ValueError):
+            raise ValueError("Malformed cursor")
+
+        if not isinstance(values, list) or len(values) != len(self.keys):
+            raise ValueError("Malformed cursor")
+
+        return {key: parse(value)
+                for (key, parse), value in zip(self.keys, values)}
+
+    def cursors(self, records: Sequence, prefix: str="") -> Optional[dict]:
+        """Returns cursors to the previous and next pages, pointing to
+        the first and last records of the current page."""
+        if not records or not self.keys:
+            return None
+
+        return {
+            "before": self.encode_cursor(records[0], prefix),
+            "after": self.encode_cursor(records[-1], prefix)
+        }
+
+    def validate_id(self, id: Union[int, str]
+                    ) -> Union[int, str, Dict[str, Any]]:
+        """Returns validated ID, or values of the sort keys, if a cursor
+        is specified instead of ID.
 
         TODO: Validation."""
+        if self.keys and isinstance(id, str) and "." in id:
+            return self.decode_cursor(id)
         return id
 
     def validate(self,
                  before: Optional[Union[int, str]]=None,
                  after: Optional[Union[int, str]]=None,
                  limit: Optional[Union[int, str]]=None
-                 ) -> Tuple[Optional[int], int, Direction]:
+                 ) -> Tuple[Optional[Union[int, str, Dict[str, Any]]],
+                            int, Direction]:
         """Validate a listing query values.
-        Returns a ID of thing, from  which to search, and the correct
-        value of limit. If neither of `before` and `after` is
-        specified, returns None as ID of thing and `after`, that means
-        to search from start of the list of things.
+        Returns a ID of thing (or values of its sort keys, if a cursor
+        is specified), from  which to search, and the correct value of
+        limit. If neither of `before` and `after` is specified, returns
+        None as ID of thing and `after`, that means to search from
+        start of the list of things.
         """
         limit = self.validate_limit(limit)
 
@@ -2,6 +2,7 @@
 Event Bot Server
 """
 
+import json
 from collections import OrderedDict
 
 
@@ -13,6 +14,17 @@ def ok(data):
     ])
 
 
+def ok_list(items, cursors=None) -> bytes:
+    """Builds success response body with a list of already encoded JSON
+    values, and listing cursors, if any."""
+    body = '{"status":"ok","data":[' + ",".join(items) + "]"
+
+    if cursors is not None:
+        body += ',"cursors":' + json.dumps(cursors, separators=(",", ":"))
+
+    return (body + "}").encode()
+
+
 def error(message=None):
     """Builds error response structure with a provided data."""
     return OrderedDict([
@@ -2,25 +2,28 @@
 Event Bot Server
 """
 
+import asyncio
 import logging
+import random
 import time
 import typing
+import uuid
 
 
 TIMESTAMP_BITS = 41
-TIMESTAMP_BITS = 10
+MACHINE_ID_BITS = 10
 SEQUENCE_NUMBER_BITS = 12
-EPOCH = 1514764800  # 1st second of 2018
+EPOCH = 1514764800000  # 1st millisecond of 2018
 
 
 logger = logging.getLogger(__name__)
 
-max_machine_id = -1 ^ (-1 << TIMESTAMP_BITS)
+max_machine_id = -1 ^ (-1 << MACHINE_ID_BITS)
 
-timestamp_shift = TIMESTAMP_BITS + SEQUENCE_NUMBER_BITS
+timestamp_shift = MACHINE_ID_BITS + SEQUENCE_NUMBER_BITS
 machine_id_shift = SEQUENCE_NUMBER_BITS
 
-machine_id_mask = -1 ^ (-1 << TIMESTAMP_BITS) << machine_id_shift
+machine_id_mask = (-1 ^ (-1 << MACHINE_ID_BITS)) << machine_id_shift
 sequence_number_mask = -1 ^ (-1 << SEQUENCE_NUMBER_BITS)
 
 
@@ -53,9 +56,25 @@ def first_snowflake_for_timestamp(timestamp: int, machine_id: int=0) -> int:
     )
 
 
+def uuid_of_snowflake(snowflake: int) -> uuid.UUID:
+    """Time-ordered UUID from Snowflake ID.
+
+    The Snowflake ID is the most significant half, so UUIDs are ordered
+    by time, and the rest is random, so UUIDs stay unique, even if the
+    same Machine ID is misconfigured for several machines."""
+    return uuid.UUID(int=(snowflake << 64) | random.getrandbits(64))
+
+
+def snowflake_of_uuid(id: uuid.UUID) -> int:
+    """Get Snowflake ID from time-ordered UUID."""
+    return id.int >> 64
+
+
 def generator(machine_id: int,
               sleep=lambda x: time.sleep(x / 1000.0),
               now=lambda: int(time.time() * 1000)):
+    """Snowflake IDs generator, which sleeps, while the clock is behind,
+    for scripts. The server uses :class:`Allocator`."""
     assert 0 <= machine_id <= max_machine_id
 
     last_timestamp = -1
@@ -87,3 +106,85 @@ def generator(machine_id: int,
             (machine_id << machine_id_shift) |
             sequence_number
         )
+
+
+def now_ms() -> int:
+    """Current timestamp in ms from computer epoch."""
+    return int(time.time() * 1000)
+
+
+class Allocator:
+    """Snowflake IDs allocator, which never blocks the event loop.
+
+    IDs are allocated in blocks, a block is contiguous within the same
+    millisecond. IDs are unique and increasing, even if the clock moves
+    backwards: :meth:`reserve` awaits, until the clock catches up, and
+    :meth:`allocate` borrows following milliseconds instead.
+    """
+
+    def __init__(self, machine_id: int, now: typing.Callable[[], int]=now_ms):
+        assert 0 <= machine_id <= max_machine_id
+
+        self.machine_id = machine_id
+        self.now = now
+
+        self._last_timestamp = -1
+        self._sequence_number = sequence_number_mask
+
+    def _take(self, timestamp: int, count: int) -> typing.List[int]:
+        """Allocates up to `count` IDs for the timestamp, which is not
+        earlier, than the last one."""
+        if timestamp > self._last_timestamp:
+            self._last_timestamp = timestamp
+            self._sequence_number = -1
+
+        first = self._sequence_number + 1
+        last = min(first + count, sequence_number_mask + 1)
+        self._sequence_number = last - 1
+
+        prefix = (
+            ((timestamp - EPOCH) << timestamp_shift) |
+            (self.machine_id << machine_id_shift)
+        )
+        return [prefix | sequence_number
+                for sequence_number in range(first, last)]
+
+    def _next_timestamp(self) -> int:
+        """Returns the last timestamp, or the following one, if all its
+        sequence numbers are taken."""
+        if self._sequence_number >= sequence_number_mask:
+            return self._last_timestamp + 1
+        return self._last_timestamp
+
+    def allocate(self, count: int=1) -> typing.List[int]:
+        """Allocates `count` IDs at once, without waiting for the clock.
+
+        If the clock is behind, IDs of following milliseconds are taken,
+        so they could be slightly ahead of the real time."""
+        ids = []
+
+        while len(ids) < count:
+            timestamp = max(self.now(), self._next_timestamp())
+            ids.extend(self._take(timestamp, count - len(ids)))
+
+        return ids
+
+    async def reserve(self, count: int=1) -> typing.List[int]:
+        """Reserves `count` IDs, awaiting, while the clock is behind the
+        last allocated ID."""
+        ids = []
+
+        while len(ids) < count:
+            timestamp = self.now()
+            next_timestamp = self._next_timestamp()
+
+            if timestamp < next_timestamp:
+                if timestamp < self._last_timestamp:
+                    logger.warning("Clock is moving backwards. "
+                                   "Waiting until %i", self._last_timestamp)
+                await asyncio.sleep((next_timestamp - timestamp) / 1000.0)
+                continue
+
+            ids.extend(self._take(timestamp, count - len(ids)))
+
+        return ids
@@ -3,4 +3,5 @@ Event Bot Server
 """
 
 from . import base
+from . import templates
 from . import types
@@ -2,9 +2,36 @@
 Event Bot Server
 """
 
+from typing import Any, Callable, Optional, Sequence, Tuple
+
 import asyncpg
 import sqlalchemy as sa
 
+from eventbot.lib import json_encoding
+
+
+Fields = Sequence[Tuple[str, Optional[Callable[[Any], Any]]]]
+"""JSON fields specification: column keys with converters, None means
+the value is used as is."""
+
+
+def isoformat(value) -> str:
+    """Converts a date or datetime to the ISO 8601 format."""
+    return value.isoformat()
+
+
+def str_list(values) -> list:
+    """Converts an array to the list of str, null to an empty list."""
+    return [str(value) for value in values or ()]
+
+
+def json_format(fields: Fields, obj) -> dict:
+    """Returns JSON-ready representation of the parsed object."""
+    return {
+        key: obj[key] if convert is None else convert(obj[key])
+        for key, convert in fields
+    }
+
 
 class Table(sa.Table):
     """SQLAlchemy table with a parsing support."""
@@ -18,3 +45,79 @@ class Table(sa.Table):
                 parsed[key] = record[prefix + key]
 
         return parsed
+
+    def mapper(self, fields: Fields, columns: Sequence[str],
+               prefix: str="") -> Callable[[asyncpg.Record], dict]:
+        """Compile a function, mapping an :class:`asyncpg.Record` object
+        straight into JSON-ready dict.
+
+        Column positions are resolved once for the result columns of
+        the statement, so records are accessed by index only. Fields
+        of columns, missing in the statement, are always None.
+        """
+        positions = {name: i for i, name in enumerate(columns)}
+        namespace = {}
+        items = []
+
+        for i, (key, convert) in enumerate(fields):
+            position = positions.get(prefix + key)
+
+            if position is None:
+                value = "None"
+            elif convert is None:
+                value = f"record[{position}]"
+            else:
+                namespace[f"convert_{i}"] = convert
+                value = f"convert_{i}(record[{position}])"
+
+            items.append(f"{key!r}: {value}")
+
+        source = f"def map_record(record):\n    return {{{', '.join(items)}}}"
+        exec(source, namespace)
+
+        return namespace["map_record"]
+
+    def encoder(self, fields: Fields, columns: Sequence[str],
+                prefix: str="") -> Callable[[asyncpg.Record], str]:
+        """Compile a function, encoding an :class:`asyncpg.Record` object
+        straight into JSON object text.
+
+        Uses the same fields and column positions, as :meth:`mapper`,
+        but converted values are written right into the text, w/o an
+        intermediate dict.
+        """
+        positions = {name: i for i, name in enumerate(columns)}
+        namespace = {
+            "encode_string": json_encoding.encode_string,
+            "encode_value": json_encoding.encode_value
+        }
+        parts = []
+
+        for i, (key, convert) in enumerate(fields):
+            position = positions.get(prefix + key)
+            separator = "{" if i == 0 else ","
+            name = json_encoding.encode_string(key)
+            parts.append(repr(f"{separator}{name}:"))
+
+            if position is None:
+                parts.append(repr("null"))
+                continue
+
+            value = f"record[{position}]"
+            if convert is not None:
+                namespace[f"convert_{i}"] = convert
+                value = f"convert_{i}({value})"
+
+            # These converters always return str
+            if convert in (str, isoformat):
+                parts.append(f"encode_string({value})")
+            else:
+                parts.append(f"encode_value({value})")
+
+        parts.append(repr("}" if parts else "{}"))
+
+        source = (f"def encode_record(record):\n"
+                  f"    return \"\".join(({', '.join(parts)}))")
+        exec(source, namespace)
+
+        return namespace["encode_record"]
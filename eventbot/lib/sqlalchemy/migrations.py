@@ -0,0 +1,167 @@
+"""
+Event Bot Server
+"""
+
+from typing import List, NamedTuple, Set, Tuple
+
+import sqlalchemy as sa
+from asyncpg.connection import Connection
+from sqlalchemy.schema import (
+    AddConstraint, CreateColumn, CreateIndex, CreateTable)
+
+from eventbot.lib.sqlalchemy.templates import dialect
+
+
+LOCK_ID = 0x6576656e74626f74
+"""Advisory lock, taken while the schema is upgraded, so concurrently
+started workers do not upgrade it twice."""
+
+
+# Catalog queries
+
+select_tables = """
+SELECT tablename FROM pg_catalog.pg_tables
+WHERE schemaname = current_schema()
+"""
+
+select_columns = """
+SELECT table_name, column_name FROM information_schema.columns
+WHERE table_schema = current_schema()
+"""
+
+select_constraints = """
+SELECT c.conname FROM pg_catalog.pg_constraint c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.connamespace
+WHERE n.nspname = current_schema()
+"""
+
+select_indexes = """
+SELECT indexname FROM pg_catalog.pg_indexes
+WHERE schemaname = current_schema()
+"""
+
+
+class Schema(NamedTuple):
+    """Names of the objects of a live database schema."""
+    tables: Set[str]
+    columns: Set[Tuple[str, str]]
+    constraints: Set[str]
+    indexes: Set[str]
+
+
+async def inspect(connection: Connection) -> Schema:
+    """Returns the live database schema."""
+    return Schema(
+        tables={row[0] for row in await connection.fetch(select_tables)},
+        columns={(row[0], row[1])
+                 for row in await connection.fetch(select_columns)},
+        constraints={row[0]
+                     for row in await connection.fetch(select_constraints)},
+        indexes={row[0] for row in await connection.fetch(select_indexes)}
+    )
+
+
+def compile_ddl(ddl: sa.schema.DDLElement) -> str:
+    """Compiles a DDL statement."""
+    return str(ddl.compile(dialect=dialect))
+
+
+def constraints(table: sa.Table) -> List[sa.Constraint]:
+    """Returns named constraints of the table, which could be added to
+    an existing table. Foreign keys are the last ones."""
+    return sorted((
+        constraint for constraint in table.constraints
+        if isinstance(constraint, (sa.PrimaryKeyConstraint,
+                                   sa.UniqueConstraint,
+                                   sa.ForeignKeyConstraint))
+        and constraint.columns
+    ), key=lambda constraint: (
+        isinstance(constraint, sa.ForeignKeyConstraint), constraint.name))
+
+
+def deduplicate(constraint: sa.Constraint) -> str:
+    """Returns a statement, which deletes rows, violating the primary key
+    or unique constraint, so it could be added to an existing table. The
+    first of duplicate rows, by their physical location, is kept.
+
+    Rows with nulls are never duplicates, as in the unique constraint."""
+    table = constraint.table.name
+    matches = " AND ".join(f"a.{column.name} = b.{column.name}"
+                           for column in constraint.columns)
+
+    return (f"DELETE FROM {table} a USING {table} b "
+            f"WHERE a.ctid > b.ctid AND {matches}")
+
+
+def indexes(metadata: sa.MetaData) -> List[str]:
+    """Returns names of all indexes, the metadata declares, including
+    indexes of primary key and unique constraints."""
+    names = []
+
+    for table in metadata.sorted_tables:
+        names.extend(
+            constraint.name for constraint in constraints(table)
+            if not isinstance(constraint, sa.ForeignKeyConstraint))
+        names.extend(index.name for index in table.indexes)
+
+    return names
+
+
+def upgrade_statements(metadata: sa.MetaData, schema: Schema) -> List[str]:
+    """Returns statements, that upgrade the live schema to the metadata.
+
+    Missing tables, columns, constraints and indexes are created, other
+    differences are not detected. Tables are created in the order of
+    their foreign keys dependencies. Duplicate rows are deleted, before
+    a primary key or unique constraint is added to an existing table.
+    """
+    statements = []
+
+    for table in metadata.sorted_tables:
+        if table.name not in schema.tables:
+            statements.append(compile_ddl(CreateTable(table)))
+            statements.extend(compile_ddl(CreateIndex(index))
+                              for index in table.indexes)
+            continue
+
+        for column in table.columns:
+            if (table.name, column.name) not in schema.columns:
+                statements.append(
+                    f"ALTER TABLE {table.name} "
+                    f"ADD COLUMN {compile_ddl(CreateColumn(column))}")
+
+        for constraint in constraints(table):
+            if constraint.name not in schema.constraints:
+                if not isinstance(constraint, sa.ForeignKeyConstraint):
+                    statements.append(deduplicate(constraint))
+                statements.append(compile_ddl(AddConstraint(constraint)))
+
+        for index in table.indexes:
+            if index.name not in schema.indexes:
+                statements.append(compile_ddl(CreateIndex(index)))
+
+    return statements
+
+
+async def upgrade(connection: Connection,
+                  metadata: sa.MetaData) -> List[str]:
+    """Upgrades the live schema to the metadata in a single transaction
+    and returns executed statements."""
+    async with connection.transaction():
+        await connection.execute("SELECT pg_advisory_xact_lock($1)", LOCK_ID)
+
+        statements = upgrade_statements(metadata, await inspect(connection))
+
+        for statement in statements:
+            await connection.execute(statement)
+
+    return statements
+
+
+async def missing_indexes(connection: Connection,
+                          metadata: sa.MetaData) -> List[str]:
+    """Returns names of indexes, the metadata declares, but the live
+    schema does not have."""
+    schema = await inspect(connection)
+    return [name for name in indexes(metadata)
+            if name not in schema.indexes]
@@ -0,0 +1,115 @@
+"""
+Event Bot Server
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from asyncpgsa.connection import get_dialect
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.dml import Insert, UpdateBase
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+
+
+dialect = get_dialect()
+"""Dialect, used by :func:`asyncpgsa.compile_query`."""
+
+registry: Dict[str, "Template"] = {}
+"""All compiled templates, by name."""
+
+names: Dict[str, str] = {}
+"""Names of all compiled templates, by the query."""
+
+
+class Template:
+    """Query, compiled once for the whole process lifetime.
+
+    Values are declared with :func:`sqlalchemy.bindparam` and bound by
+    name on each execution. Produces the same statements, as
+    :func:`asyncpgsa.compile_query` does, so they are hitting the
+    asyncpg prepared statements cache.
+    """
+
+    def __init__(self, name: str, query: ClauseElement):
+        if name in registry:
+            raise ValueError(f"Query template {name} is already registered")
+
+        compiled = query.compile(dialect=dialect)
+
+        self.name = name
+        self.keys = sorted(compiled.params)
+        self.query = compiled.string % {
+            key: "$" + str(i) for i, key in enumerate(self.keys, start=1)
+        }
+
+        # names of the result columns, in order
+        self.columns = self._result_columns(query, compiled)
+
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError(f"Query template {name} has ambiguous result "
+                             f"columns: {', '.join(self.columns)}")
+
+        self.values = dict(compiled.params)
+        self.required = {key for key in self.keys
+                         if compiled.binds[key].required}
+        self.processors = compiled._bind_processors
+        self.defaults = self._column_defaults(query)
+
+        registry[name] = self
+        names[self.query] = name
+
+    @staticmethod
+    def _result_columns(query: ClauseElement, compiled) -> List[str]:
+        """Returns names of the result columns of the statement itself.
+
+        The compiler lists RETURNING columns of data-modifying CTEs too,
+        after the columns of the statement, so they are cut off."""
+        if isinstance(query, CompoundSelect):
+            query = query.selects[0]
+
+        if isinstance(query, Select):
+            count = len(list(query.inner_columns))
+        elif isinstance(query, UpdateBase):
+            count = len(query._returning or ())
+        else:
+            count = len(compiled._result_columns)
+
+        return [column[0] for column in compiled._result_columns[:count]]
+
+    @staticmethod
+    def _column_defaults(query: ClauseElement) -> Dict[str, Callable]:
+        """Returns Python-side column defaults of the insert statement."""
+        defaults = {}
+
+        if isinstance(query, Insert):
+            for column in query.table.columns:
+                default = column.default
+                if default is None:
+                    continue
+                if default.is_callable:
+                    defaults[column.key] = lambda arg=default.arg: arg({})
+                elif default.is_scalar:
+                    defaults[column.key] = lambda arg=default.arg: arg
+
+        return defaults
+
+    def bind(self, **values: Any) -> Tuple[str, List[Any]]:
+        """Returns the query and the list of its parameters."""
+        params = []
+
+        for key in self.keys:
+            if key in values:
+                value = values[key]
+            elif key in self.defaults:
+                value = self.defaults[key]()
+            elif key in self.required:
+                raise KeyError(f"Value for {key} is required by the query "
+                               f"template {self.name}")
+            else:
+                value = self.values[key]
+
+            if key in self.processors:
+                value = self.processors[key](value)
+
+            params.append(value)
+
+        return self.query, params
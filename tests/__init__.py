@@ -0,0 +1,3 @@
+"""
+Event Bot Server
+"""
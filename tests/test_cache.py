@@ -0,0 +1,50 @@
+"""
+Event Bot Server
+"""
+
+from eventbot.lib import cache
+
+
+def test_versions_are_bounded():
+    schedules = cache.LRUCache(max_size=1024, max_versions=4)
+
+    for key in range(100):
+        schedules.invalidate(key)
+
+    assert len(schedules._versions) == 4
+
+
+def test_stale_value_is_rejected_after_version_is_forgotten():
+    schedules = cache.LRUCache(max_size=1024, max_versions=1)
+
+    version = schedules.version("a")
+    schedules.invalidate("a")
+    schedules.invalidate("b")
+
+    assert "a" not in schedules._versions
+    assert not schedules.set("a", b"stale", version)
+    assert schedules.set("a", b"fresh", schedules.version("a"))
+    assert schedules.get("a") == b"fresh"
+
+
+def test_invalidate_all_rejects_stale_values():
+    schedules = cache.LRUCache(max_size=1024, max_versions=4)
+
+    version = schedules.version("a")
+    schedules.invalidate_all()
+
+    assert not schedules.set("a", b"stale", version)
+
+
+def test_known_versions_only_grow():
+    versions = cache.VersionsCache(max_entries=2)
+
+    versions.update("a", 2)
+    versions.update("a", 1)
+    assert versions.get("a") == 2
+
+    versions.update("b", 1)
+    versions.get("a")
+    versions.update("c", 1)
+
+    assert "a" in versions and "b" not in versions and len(versions) == 2
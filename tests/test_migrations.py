@@ -0,0 +1,43 @@
+"""
+Event Bot Server
+"""
+
+import sqlalchemy as sa
+
+from eventbot.lib.sqlalchemy import migrations
+
+
+metadata = sa.MetaData()
+
+links = sa.Table(
+    "links", metadata,
+    sa.Column("session_id", sa.Integer, primary_key=True),
+    sa.Column("person_id", sa.Integer, primary_key=True),
+    sa.PrimaryKeyConstraint("session_id", "person_id", name="links_pkey"))
+
+
+def test_duplicates_are_deleted_before_primary_key_is_added():
+    schema = migrations.Schema(
+        tables={"links"},
+        columns={("links", "session_id"), ("links", "person_id")},
+        constraints=set(),
+        indexes=set())
+
+    statements = migrations.upgrade_statements(metadata, schema)
+
+    assert statements == [
+        "DELETE FROM links a USING links b WHERE a.ctid > b.ctid "
+        "AND a.session_id = b.session_id AND a.person_id = b.person_id",
+        "ALTER TABLE links ADD CONSTRAINT links_pkey "
+        "PRIMARY KEY (session_id, person_id)"
+    ]
+
+
+def test_new_tables_are_not_deduplicated():
+    schema = migrations.Schema(
+        tables=set(), columns=set(), constraints=set(), indexes=set())
+
+    statements = migrations.upgrade_statements(metadata, schema)
+
+    assert len(statements) == 1
+    assert statements[0].strip().startswith("CREATE TABLE links")
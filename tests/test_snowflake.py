@@ -0,0 +1,119 @@
+"""
+Event Bot Server
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from eventbot.lib import snowflake
+
+
+MACHINE_ID = 513
+
+
+class Clock:
+    """Fake clock in ms, which randomly stays, goes forwards, and jumps
+    backwards on every reading."""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.timestamp = snowflake.EPOCH + 1000
+
+    def __call__(self) -> int:
+        chance = self.random.random()
+
+        if chance < 0.05:
+            self.timestamp -= self.random.randint(1, 3)
+        elif chance < 0.3:
+            self.timestamp += 1
+
+        return self.timestamp
+
+
+async def allocate_concurrently(allocator: snowflake.Allocator, seed: int,
+                                tasks: int=50, blocks: int=20):
+    """Allocates blocks of random sizes from concurrent tasks, both with
+    :meth:`Allocator.allocate` and :meth:`Allocator.reserve`, and returns
+    blocks of each task."""
+    async def task(i: int):
+        task_random = random.Random(seed * 1000 + i)
+        allocated = []
+
+        for _ in range(blocks):
+            count = task_random.choice([1, 1, 7, 500, 5000])
+
+            if task_random.random() < 0.5:
+                allocated.append(await allocator.reserve(count))
+            else:
+                allocated.append(allocator.allocate(count))
+                await asyncio.sleep(0)
+
+        return allocated
+
+    return await asyncio.gather(*[task(i) for i in range(tasks)])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_allocator_under_contention(seed):
+    allocator = snowflake.Allocator(MACHINE_ID, now=Clock(seed))
+    results = asyncio.run(allocate_concurrently(allocator, seed))
+
+    ids = [id for blocks in results for block in blocks for id in block]
+
+    # unique
+    assert len(ids) == len(set(ids))
+
+    for blocks in results:
+        task_ids = [id for block in blocks for id in block]
+
+        # increasing within each task, blocks are increasing themselves
+        assert all(a < b for a, b in zip(task_ids, task_ids[1:]))
+
+    for id in ids:
+        assert snowflake.machine_id_of_snowflake(id) == MACHINE_ID
+        assert 0 <= snowflake.sequence_number_of_snowflake(id) \
+            <= snowflake.sequence_number_mask
+
+
+def test_allocated_block_size():
+    allocator = snowflake.Allocator(0, now=lambda: snowflake.EPOCH)
+
+    # larger, than sequence numbers of a single millisecond
+    block = allocator.allocate(10000)
+
+    assert len(block) == 10000
+    assert block == sorted(block)
+
+
+def test_reserve_waits_for_clock():
+    clock = Clock(0)
+    clock.timestamp = snowflake.EPOCH + 1000
+
+    allocator = snowflake.Allocator(0, now=lambda: clock.timestamp)
+    last = allocator.allocate(1)[0]
+
+    # clock moves backwards, reserve waits, until it catches up
+    clock.timestamp -= 5
+
+    async def catch_up():
+        await asyncio.sleep(0.001)
+        clock.timestamp += 10
+
+    async def reserve():
+        return (await asyncio.gather(allocator.reserve(1), catch_up()))[0]
+
+    id, = asyncio.run(reserve())
+
+    assert id > last
+    assert snowflake.real_timestamp_of_snowflake(id) == clock.timestamp
+
+
+def test_snowflake_bit_widths():
+    id = snowflake.first_snowflake_for_timestamp(
+        snowflake.EPOCH + 12345, snowflake.max_machine_id)
+
+    assert snowflake.real_timestamp_of_snowflake(id) == snowflake.EPOCH + 12345
+    assert snowflake.machine_id_of_snowflake(id) == snowflake.max_machine_id
+    assert snowflake.sequence_number_of_snowflake(id) == 0
@@ -0,0 +1,58 @@
+"""
+Event Bot Server
+"""
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.sql import select
+
+from eventbot.lib.sqlalchemy.base import Table
+from eventbot.lib.sqlalchemy.templates import Template
+
+
+metadata = sa.MetaData()
+
+things = Table(
+    "things",
+    metadata,
+
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(1024), nullable=False)
+)
+
+flags = select([sa.literal(True).label("thing_exists")]).alias("flags")
+
+
+def test_columns_of_statement_with_returning_cte():
+    """RETURNING columns of a data-modifying CTE are not result columns
+    of the statement, which selects from it."""
+    inserted = (things
+        .insert()
+        .values(name=sa.bindparam("name"))
+        .returning(*things.c)
+        .cte("inserted"))
+
+    template = Template("tests.insert_with_flags",
+        select([flags, inserted])
+        .select_from(flags.outerjoin(inserted, sa.true())))
+
+    assert template.columns == ["thing_exists", "id", "name"]
+
+    map_thing = things.mapper(
+        [("id", None), ("name", None)], template.columns)
+    assert map_thing((True, 1, "thing")) == {"id": 1, "name": "thing"}
+
+
+def test_columns_of_returning_statement():
+    template = Template("tests.insert_returning", things
+        .insert()
+        .values(name=sa.bindparam("name"))
+        .returning(*things.c))
+
+    assert template.columns == ["id", "name"]
+
+
+def test_ambiguous_columns():
+    with pytest.raises(ValueError):
+        Template("tests.ambiguous",
+                 select([things.c.id, things.c.id.label("id")]))